@@ -0,0 +1,69 @@
+"""
+This file contains the BatchEvaluator class, which scores every child of a position
+from scratch in one vectorized NumPy operation.
+
+NumPy is optional and only needed by this module.
+The players use VirtualBoard.evaluate_moves, which gives the same evaluations
+from the tile balances kept up to date by the BitBoard,
+and costs less than a NumPy call for the few dozen moves of a position.
+"""
+
+from bitboard import BitBoard, iterate_bits
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class BatchEvaluator:
+    """
+    Represents the tiles of a board as a membership matrix, with a row per tile
+    and a column per socket, and the marbles as occupancy vectors over the sockets.
+    The score difference of every child of a position is then a product of the points of the tiles
+    by the sign of their balances, computed for all the children at once.
+    """
+
+    def __init__(self, bitboard: BitBoard) -> None:
+        if np is None:
+            raise ImportError("BatchEvaluator requires NumPy")
+
+        self.number_of_sockets = bitboard.number_of_sockets
+        self.number_of_bytes = (self.number_of_sockets + 7) // 8
+
+        self.tile_membership = np.zeros(
+            (len(bitboard.tile_masks), self.number_of_sockets), dtype=np.int32
+        )
+        for tile_index, tile_mask in enumerate(bitboard.tile_masks):
+            for socket_index in iterate_bits(tile_mask):
+                self.tile_membership[tile_index, socket_index] = 1
+
+        self.tile_points = np.array(bitboard.tile_points, dtype=np.int32)
+
+    def get_occupancy(self, mask: int) -> "np.ndarray":
+        """Get the vector with a 1 for every socket in the mask."""
+        mask_bytes = np.frombuffer(
+            mask.to_bytes(self.number_of_bytes, "little"), dtype=np.uint8
+        )
+        bits = np.unpackbits(mask_bytes, bitorder="little")
+        return bits[: self.number_of_sockets].astype(np.int32)
+
+    def get_tile_balances(self, bitboard: BitBoard) -> "np.ndarray":
+        """Get the number of player 1 marbles minus player 2 marbles on every tile."""
+        player1_mask, player2_mask = bitboard.player_masks
+        return self.tile_membership @ (
+            self.get_occupancy(player1_mask) - self.get_occupancy(player2_mask)
+        )
+
+    def evaluate_moves(self, bitboard: BitBoard, moves: list[int]) -> "np.ndarray":
+        """
+        Get the score difference (player 1 score minus player 2 score) after each move
+        of the player to move, given by socket index.
+        """
+        balances = self.get_tile_balances(bitboard)
+        direction = 1 if bitboard.player_to_move == 0 else -1
+
+        child_balances = (
+            balances[:, np.newaxis] + direction * self.tile_membership[:, moves]
+        )
+        return self.tile_points @ np.sign(child_balances)
@@ -0,0 +1,203 @@
+"""
+This file contains the BatchSimulator class, which plays thousands of random games in lockstep,
+with the sockets and marbles of all the games stored as NumPy arrays.
+
+NumPy is optional and only needed by this module.
+"""
+
+from bitboard import NO_SOCKET
+from constants import MARBLES_PER_PLAYER
+from game_state import GameState
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Tile, row and column of the padding sockets of boards with fewer sockets
+NO_LINE = -1
+
+
+# pylint: disable=too-many-instance-attributes
+class BatchSimulator:
+    """
+    Plays a random game from each of the given positions, which can be on different boards.
+    Every array has a row per game and, for sockets, a column per socket of the game's board;
+    boards with fewer sockets are padded with sockets that are never empty.
+
+    At every turn, each game that is not over places a marble of the player to move
+    in one of their legal sockets, chosen uniformly at random like RandomPlayer.
+    The legal sockets are found with array masks:
+    empty, in the row or column of the opponent's last marble,
+    and not on the tile of either player's last marble.
+    """
+
+    def __init__(self, states: list[GameState], seed: int = None) -> None:
+        if np is None:
+            raise ImportError("BatchSimulator requires NumPy")
+
+        self.rng = np.random.default_rng(seed)
+        self.number_of_games = len(states)
+        self.number_of_sockets = max((len(state.cells) for state in states), default=0)
+        shape = (self.number_of_games, self.number_of_sockets)
+
+        padding = [
+            (NO_LINE,) * (self.number_of_sockets - len(state.cells)) for state in states
+        ]
+        cells = np.array(
+            [state.cells + pad for state, pad in zip(states, padding)], dtype=np.int16
+        ).reshape(shape)
+        sizes = np.array([state.size for state in states], dtype=np.int16)[
+            :, np.newaxis
+        ]
+        self.socket_tiles = np.array(
+            [state.socket_tiles + pad for state, pad in zip(states, padding)],
+            dtype=np.int16,
+        ).reshape(shape)
+        self.socket_rows = np.where(cells == NO_LINE, NO_LINE, cells % sizes)
+        self.socket_columns = np.where(cells == NO_LINE, NO_LINE, cells // sizes)
+
+        player1_marbles = self.get_mask_bits(
+            [state.player_masks[0] for state in states]
+        )
+        player2_marbles = self.get_mask_bits(
+            [state.player_masks[1] for state in states]
+        )
+        # 1 for a marble of player 1, -1 for a marble of player 2
+        self.marbles = player1_marbles.astype(np.int8) - player2_marbles
+        self.empty = (
+            (self.socket_tiles != NO_LINE) & ~player1_marbles & ~player2_marbles
+        )
+
+        self.last_marbles = np.array(
+            [state.last_marbles for state in states], dtype=np.int16
+        ).reshape(self.number_of_games, 2)
+        self.player_to_move = np.array(
+            [state.player_to_move for state in states], dtype=np.int8
+        )
+        self.turns = np.count_nonzero(self.marbles, axis=1).astype(np.int16)
+
+        self.number_of_tiles = 1 + max(
+            (max(state.socket_tiles, default=NO_LINE) for state in states),
+            default=NO_LINE,
+        )
+        # Every tile is worth one point per socket
+        self.tile_points = self.get_tile_sums(self.socket_tiles != NO_LINE)
+
+        self.active = self.turns < 2 * MARBLES_PER_PLAYER
+        # The sockets played by every game, in order, or NO_SOCKET after its end
+        self.moves = np.full(
+            (self.number_of_games, 2 * MARBLES_PER_PLAYER), NO_SOCKET, np.int16
+        )
+        self.number_of_moves = np.zeros(self.number_of_games, dtype=np.int16)
+
+    def get_mask_bits(self, masks: list[int]) -> "np.ndarray":
+        """Get the bits of the socket mask of every game, as a boolean array."""
+        number_of_bytes = (self.number_of_sockets + 7) // 8
+        mask_bytes = np.frombuffer(
+            b"".join(mask.to_bytes(number_of_bytes, "little") for mask in masks),
+            dtype=np.uint8,
+        ).reshape(self.number_of_games, number_of_bytes)
+        bits = np.unpackbits(mask_bytes, axis=1, bitorder="little")
+        return bits[:, : self.number_of_sockets].astype(bool)
+
+    def get_tile_sums(self, values: "np.ndarray") -> "np.ndarray":
+        """Get the sum of the values of the sockets of every tile of every game."""
+        games = np.arange(self.number_of_games)[:, np.newaxis]
+        tiles = np.where(self.socket_tiles == NO_LINE, 0, self.socket_tiles)
+        sums = np.bincount(
+            (games * self.number_of_tiles + tiles).ravel(),
+            weights=np.where(self.socket_tiles == NO_LINE, 0, values).ravel(),
+            minlength=self.number_of_games * self.number_of_tiles,
+        )
+        return sums.reshape(self.number_of_games, self.number_of_tiles).astype(np.int32)
+
+    def get_socket_values(self, values: "np.ndarray", sockets: "np.ndarray"):
+        """Get the value of the given socket of every game, or NO_LINE for NO_SOCKET."""
+        games = np.arange(self.number_of_games)
+        return np.where(
+            sockets == NO_SOCKET, NO_LINE, values[games, np.maximum(sockets, 0)]
+        )
+
+    def get_legal_moves(self) -> "np.ndarray":
+        """Get the mask of the sockets the player to move can place a marble in, in every game."""
+        games = np.arange(self.number_of_games)
+        opponent_last = self.last_marbles[games, 1 - self.player_to_move]
+
+        opponent_row = self.get_socket_values(self.socket_rows, opponent_last)
+        opponent_column = self.get_socket_values(self.socket_columns, opponent_last)
+        in_line = (self.socket_rows == opponent_row[:, np.newaxis]) | (
+            self.socket_columns == opponent_column[:, np.newaxis]
+        )
+        legal = self.empty & (in_line | (opponent_last == NO_SOCKET)[:, np.newaxis])
+
+        for player_index in (0, 1):
+            last_tile = self.get_socket_values(
+                self.socket_tiles, self.last_marbles[:, player_index]
+            )
+            legal &= self.socket_tiles != last_tile[:, np.newaxis]
+
+        return legal
+
+    def step(self) -> None:
+        """Plays a random legal move in every game that is not over, and ends the others."""
+        legal = self.get_legal_moves()
+        legal_counts = legal.sum(axis=1, dtype=np.int16)
+        self.active &= legal_counts > 0
+
+        games = np.flatnonzero(self.active)
+        if games.size == 0:
+            return
+
+        # The socket of every game is its n-th legal socket, with n drawn uniformly
+        choices = (self.rng.random(games.size) * legal_counts[games]).astype(np.int16)
+        legal_before = legal[games].cumsum(axis=1, dtype=np.int16)
+        sockets = (legal_before > choices[:, np.newaxis]).argmax(axis=1)
+        players = self.player_to_move[games]
+
+        self.empty[games, sockets] = False
+        self.marbles[games, sockets] = 1 - 2 * players
+        self.last_marbles[games, players] = sockets
+        self.player_to_move[games] = 1 - players
+        self.moves[games, self.number_of_moves[games]] = sockets
+        self.number_of_moves[games] += 1
+        self.turns[games] += 1
+
+        self.active &= self.turns < 2 * MARBLES_PER_PLAYER
+
+    def play(self) -> tuple["np.ndarray", "np.ndarray"]:
+        """Plays every game until it is over and returns the scores of both players."""
+        while self.active.any():
+            self.step()
+        return self.get_scores()
+
+    def get_scores(self) -> tuple["np.ndarray", "np.ndarray"]:
+        """Get the scores of player 1 and player 2 in every game."""
+        balances = self.get_tile_sums(self.marbles)
+        player1_scores = (self.tile_points * (balances > 0)).sum(axis=1)
+        player2_scores = (self.tile_points * (balances < 0)).sum(axis=1)
+        return player1_scores, player2_scores
+
+
+def simulate_random_games(
+    states: list[GameState], seed: int = None
+) -> tuple["np.ndarray", "np.ndarray"]:
+    """Plays a random game from each position and returns the scores of both players."""
+    return BatchSimulator(states, seed).play()
+
+
+if __name__ == "__main__":
+    # pylint: disable=ungrouped-imports
+    from board import BoardMaker
+
+    GAMES_PER_BOARD = 10000
+    for board_seed in range(5):
+        board_state = BoardMaker.get_standard_board(board_seed).snapshot()
+        scores1, scores2 = simulate_random_games(
+            [board_state] * GAMES_PER_BOARD, board_seed
+        )
+        print(
+            f"Board {board_seed}: player 1 wins {np.mean(scores1 > scores2):.1%}, "
+            f"player 2 wins {np.mean(scores2 > scores1):.1%}, "
+            f"mean scores {scores1.mean():.1f} - {scores2.mean():.1f}"
+        )
@@ -0,0 +1,4 @@
+"""
+Benchmarks for the engine hot paths.
+Run them from the root directory, e.g. `python -m benchmarks.bitboard_speedup`.
+"""
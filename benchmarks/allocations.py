@@ -0,0 +1,94 @@
+"""
+Measures the memory allocated to generate boards and to search positions with tracemalloc.
+
+tracemalloc only reports the memory currently allocated and its peak,
+so short-lived objects are counted while they are alive at the same time:
+the candidate tiles of a placement, or the lists of moves along the searched line.
+A few boards are generated first, so that the shared positions and the free lists
+of the interpreter are filled before measuring.
+
+Usage: `python -m benchmarks.allocations [number_of_boards] [depth]`
+"""
+
+import random
+import sys
+import tracemalloc
+
+from benchmarks.bitboard_speedup import play_random_moves
+from board import BoardMaker
+from data import GameInfo
+from player import MinimaxPlayer
+
+SEED = 0
+MOVES_BEFORE_SEARCH = 6
+WARM_UP_BOARDS = 10
+
+
+def measure_boards(number_of_boards: int) -> None:
+    """Prints the memory kept by every generated board and the peak while generating it."""
+    tracemalloc.start()
+    for board_seed in range(WARM_UP_BOARDS):
+        BoardMaker.get_standard_board(board_seed)
+
+    boards = []
+    retained = 0
+    peak = 0
+
+    for board_seed in range(WARM_UP_BOARDS, WARM_UP_BOARDS + number_of_boards):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+
+        boards.append(BoardMaker.get_standard_board(board_seed))
+
+        after, board_peak = tracemalloc.get_traced_memory()
+        retained += after - before
+        peak += board_peak - before
+    tracemalloc.stop()
+
+    print(f"Retained per board: {retained / number_of_boards:,.0f} bytes")
+    print(f"Peak per board:     {peak / number_of_boards:,.0f} bytes")
+
+
+def measure_search(number_of_positions: int, depth: int) -> None:
+    """
+    Prints the peak memory of plain minimax searches, averaged over the searches.
+    The peak is the most memory alive at once during a search, not the memory allocated by it:
+    what is freed between nodes does not count, so it does not grow with the nodes searched.
+    """
+    player = MinimaxPlayer(depth, alpha_beta=False)
+    rng = random.Random(SEED)
+
+    searches = 0
+    nodes = 0
+    peak = 0
+
+    tracemalloc.start()
+    for board_seed in range(number_of_positions):
+        _board = BoardMaker.get_standard_board(board_seed)
+        current_player = play_random_moves(_board, MOVES_BEFORE_SEARCH, rng)
+        possible_moves = _board.get_possible_moves(current_player)
+        if not possible_moves:
+            continue
+        game_info = GameInfo(
+            current_player, possible_moves, _board, MOVES_BEFORE_SEARCH
+        )
+
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+
+        player.get_next_move(game_info)
+
+        _, search_peak = tracemalloc.get_traced_memory()
+        peak += search_peak - before
+        nodes += player.nodes_searched
+        searches += 1
+    tracemalloc.stop()
+
+    print(f"Nodes per search:   {nodes / searches:,.0f}")
+    print(f"Peak per search:    {peak / searches:,.0f} bytes")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    measure_boards(count)
+    measure_search(count, int(sys.argv[2]) if len(sys.argv) > 2 else 2)
@@ -0,0 +1,78 @@
+"""
+Compares the nodes searched by plain minimax and alpha-beta at the same depth.
+
+Usage: `python -m benchmarks.alpha_beta [depth] [number_of_positions]`
+"""
+
+import random
+import sys
+import time
+
+from benchmarks.bitboard_speedup import play_random_moves
+from board import BoardMaker
+from data import GameInfo
+from player import MinimaxPlayer
+from transposition import TranspositionTable
+
+SEED = 0
+MAX_RANDOM_MOVES = 30
+
+
+def timed_search(player: MinimaxPlayer, game_info: GameInfo) -> tuple:
+    """Returns the move chosen by the player, the nodes searched and the time taken."""
+    start_time = time.perf_counter()
+    move = player.get_next_move(game_info)
+    return move, player.nodes_searched, time.perf_counter() - start_time
+
+
+# pylint: disable=too-many-locals
+def measure(depth: int, number_of_positions: int) -> None:
+    """Searches the same positions with both players and prints the nodes searched."""
+    plain = MinimaxPlayer(depth, alpha_beta=False)
+    pruned = MinimaxPlayer(depth, alpha_beta=True)
+
+    plain_totals = [0, 0.0]
+    pruned_totals = [0, 0.0]
+    rng = random.Random(SEED)
+
+    for _ in range(number_of_positions):
+        _board = BoardMaker.get_standard_board(rng.getrandbits(32))
+        number_of_moves = rng.randrange(2, MAX_RANDOM_MOVES)
+        current_player = play_random_moves(_board, number_of_moves, rng)
+        possible_moves = _board.get_possible_moves(current_player)
+        if not possible_moves:
+            continue
+
+        game_info = GameInfo(current_player, possible_moves, _board, number_of_moves)
+
+        plain_move, nodes, seconds = timed_search(plain, game_info)
+        plain_totals[0] += nodes
+        plain_totals[1] += seconds
+
+        pruned_move, nodes, seconds = timed_search(pruned, game_info)
+        pruned_totals[0] += nodes
+        pruned_totals[1] += seconds
+
+        assert plain_move == pruned_move
+
+    print(f"Minimax:    {plain_totals[0]} nodes in {plain_totals[1]:.2f} s")
+    print(f"Alpha-beta: {pruned_totals[0]} nodes in {pruned_totals[1]:.2f} s")
+    print(f"Nodes saved: {1 - pruned_totals[0] / plain_totals[0]:.1%}")
+
+    if pruned.transposition_table is not None:
+        print_table_stats(pruned.transposition_table)
+
+
+def print_table_stats(table: TranspositionTable) -> None:
+    """Prints the counters of the transposition table."""
+    print(
+        f"Transposition table: {table.hits} hits, {table.misses} misses, "
+        f"{table.overwrites} overwrites ({table.get_hit_rate():.1%} hit rate)"
+    )
+
+
+if __name__ == "__main__":
+    measure(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+    )
@@ -0,0 +1,93 @@
+"""
+Checks that the evaluations of all the children of a position match get_scores,
+and compares the time taken to evaluate them one move at a time,
+with VirtualBoard.evaluate_moves and with the NumPy BatchEvaluator.
+
+Usage: `python -m benchmarks.batch_evaluation [number_of_positions]`
+"""
+
+import random
+import sys
+import timeit
+
+from batch_evaluation import BatchEvaluator, np
+from benchmarks.bitboard_speedup import play_random_moves
+from board import BoardInterface, BoardMaker, VirtualBoard, get_scores
+from tile import Socket
+
+SEED = 0
+MAX_RANDOM_MOVES = 40
+REPETITIONS = 100
+
+
+def evaluate_one_at_a_time(vboard: VirtualBoard, moves: list[Socket]) -> list[int]:
+    """Makes every move, evaluates the board and takes the move back."""
+    evaluations = []
+    for move in moves:
+        vboard.make_move(move.index)
+        evaluations.append(vboard.evaluate())
+        vboard.unmake_move()
+    return evaluations
+
+
+def get_scores_after_moves(_board: BoardInterface, moves: list[Socket]) -> list[int]:
+    """Reference evaluations, with the scores calculated from scratch after every move."""
+    evaluations = []
+    for move in moves:
+        _board.make_move(move.index)
+        player1_score, player2_score = get_scores(_board)
+        evaluations.append(player1_score - player2_score)
+        _board.unmake_move()
+    return evaluations
+
+
+def measure(number_of_positions: int) -> None:
+    """Prints the time per position of every way of evaluating the children."""
+    times = {"One at a time": 0.0, "evaluate_moves": 0.0, "BatchEvaluator": 0.0}
+    number_of_moves = 0
+    rng = random.Random(SEED)
+
+    for _ in range(number_of_positions):
+        _board = BoardMaker.get_standard_board(rng.getrandbits(32))
+        current_player = play_random_moves(
+            _board, rng.randrange(1, MAX_RANDOM_MOVES), rng
+        )
+        vboard = VirtualBoard(_board, current_player)
+        moves = vboard.get_possible_moves()
+        number_of_moves += len(moves)
+
+        expected = get_scores_after_moves(_board, moves)
+        assert evaluate_one_at_a_time(vboard, moves) == expected
+        assert vboard.evaluate_moves(moves) == expected
+
+        times["One at a time"] += timeit.timeit(
+            lambda v=vboard, m=moves: evaluate_one_at_a_time(v, m), number=REPETITIONS
+        )
+        times["evaluate_moves"] += timeit.timeit(
+            lambda v=vboard, m=moves: v.evaluate_moves(m), number=REPETITIONS
+        )
+
+        if np is not None:
+            evaluator = BatchEvaluator(_board.bitboard)
+            indices = [move.index for move in moves]
+            assert (
+                evaluator.evaluate_moves(_board.bitboard, indices).tolist() == expected
+            )
+            times["BatchEvaluator"] += timeit.timeit(
+                lambda e=evaluator, b=_board.bitboard, i=indices: e.evaluate_moves(
+                    b, i
+                ),
+                number=REPETITIONS,
+            )
+
+    calls = number_of_positions * REPETITIONS
+    print(f"{number_of_moves / number_of_positions:.1f} moves per position")
+    for name, seconds in times.items():
+        if name == "BatchEvaluator" and np is None:
+            print(f"{name}: NumPy is not installed")
+            continue
+        print(f"{name + ':':16}{seconds / calls * 1e6:.1f} us per position")
+
+
+if __name__ == "__main__":
+    measure(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
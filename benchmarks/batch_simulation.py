@@ -0,0 +1,79 @@
+"""
+Checks that the games played by BatchSimulator follow the rules, by replaying some of them
+on a BoardInterface, and compares the random games it plays per second
+with RandomPlayer against RandomPlayer in Kulami.play.
+
+Usage: `python -m benchmarks.batch_simulation [number_of_games] [number_of_boards]`
+"""
+
+import sys
+import time
+
+from batch_simulation import BatchSimulator, np
+from bitboard import NO_SOCKET
+from board import BoardInterface, BoardMaker, get_scores
+from constants import MARBLES_PER_PLAYER
+from enums import PlayerNumber
+from match_maker import play_match
+from player import RandomPlayer
+
+GAMES_TO_REPLAY = 200
+KULAMI_GAMES = 100
+
+
+def replay_game(simulator: BatchSimulator, game: int, _board: BoardInterface) -> None:
+    """Replays a simulated game, checking that every move is legal and the final scores."""
+    bitboard = _board.bitboard
+    for socket_index in simulator.moves[game]:
+        if socket_index == NO_SOCKET:
+            break
+        current_player = PlayerNumber(bitboard.player_to_move + 1)
+        legal_moves = bitboard.get_possible_moves_mask(current_player)
+        assert legal_moves >> int(socket_index) & 1, f"Illegal move in game {game}"
+        _board.make_move(int(socket_index))
+
+    if simulator.turns[game] < 2 * MARBLES_PER_PLAYER:
+        assert not bitboard.has_any_move(PlayerNumber(bitboard.player_to_move + 1))
+
+    player1_scores, player2_scores = simulator.get_scores()
+    assert get_scores(_board) == (player1_scores[game], player2_scores[game])
+
+
+def measure(number_of_games: int, number_of_boards: int) -> None:
+    """Plays the games on the boards in turn and prints the games per second."""
+    boards = [BoardMaker.get_standard_board(seed) for seed in range(number_of_boards)]
+    states = [
+        boards[game % number_of_boards].snapshot() for game in range(number_of_games)
+    ]
+
+    start_time = time.perf_counter()
+    simulator = BatchSimulator(states, seed=0)
+    player1_scores, player2_scores = simulator.play()
+    simulation_seconds = time.perf_counter() - start_time
+
+    for game in range(min(GAMES_TO_REPLAY, number_of_games)):
+        replay_game(simulator, game, BoardInterface.from_snapshot(states[game]))
+
+    start_time = time.perf_counter()
+    for seed in range(KULAMI_GAMES):
+        play_match(RandomPlayer(), RandomPlayer(), seed)
+    kulami_seconds = time.perf_counter() - start_time
+
+    print(
+        f"{min(GAMES_TO_REPLAY, number_of_games)} simulated games replayed without errors"
+    )
+    print(
+        f"Player 1 wins {np.mean(player1_scores > player2_scores):.1%}, "
+        f"player 2 wins {np.mean(player2_scores > player1_scores):.1%}"
+    )
+    print(f"Kulami.play:    {KULAMI_GAMES / kulami_seconds:10.0f} games per second")
+    print(
+        f"BatchSimulator: {number_of_games / simulation_seconds:10.0f} games per second"
+    )
+
+
+if __name__ == "__main__":
+    measure(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 100,
+    )
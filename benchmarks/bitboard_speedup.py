@@ -0,0 +1,128 @@
+"""
+Measures the speedup of the BitBoard engine over walking the Tile/Socket object graph.
+
+Usage: `python -m benchmarks.bitboard_speedup [number_of_boards]`
+"""
+
+import random
+import sys
+import timeit
+
+from board import BoardInterface, BoardMaker, get_scores
+from enums import PlayerNumber, SocketState, TileOwner
+from tile import Socket
+
+SEED = 0
+POSITIONS_PER_BOARD = 20
+REPETITIONS = 50
+
+
+def object_model_possible_moves(
+    _board: BoardInterface, current_player: PlayerNumber
+) -> list[Socket]:
+    """Reference move generation that scans every socket of the board."""
+    all_sockets = _board.get_all_sockets()
+
+    player1_last_marble = None
+    player2_last_marble = None
+    for socket in all_sockets:
+        if socket.state == SocketState.PLAYER1_LAST:
+            player1_last_marble = socket
+        elif socket.state == SocketState.PLAYER2_LAST:
+            player2_last_marble = socket
+
+    if player1_last_marble is None and player2_last_marble is None:
+        return all_sockets
+
+    if current_player == PlayerNumber.ONE:
+        last_move = player2_last_marble.position
+    else:
+        last_move = player1_last_marble.position
+
+    forbidden_tiles = {player1_last_marble.tile_id}
+    if player2_last_marble is not None:
+        forbidden_tiles.add(player2_last_marble.tile_id)
+
+    return [
+        socket
+        for socket in all_sockets
+        if socket.state == SocketState.EMPTY
+        and socket.tile_id not in forbidden_tiles
+        and (socket.position.x == last_move.x or socket.position.y == last_move.y)
+    ]
+
+
+def object_model_scores(_board: BoardInterface) -> tuple[int, int]:
+    """Reference scoring that asks every tile for its owner."""
+    player1_score = 0
+    player2_score = 0
+
+    for tile in _board.get_all_tiles():
+        owner = tile.get_owner()
+        if owner == TileOwner.PLAYER1:
+            player1_score += tile.get_points()
+        elif owner == TileOwner.PLAYER2:
+            player2_score += tile.get_points()
+
+    return (player1_score, player2_score)
+
+
+def play_random_moves(
+    _board: BoardInterface, number_of_moves: int, rng: random.Random
+) -> PlayerNumber:
+    """Plays moves chosen by the random generator on the board and returns the player to move."""
+    current_player = PlayerNumber.ONE
+    for _ in range(number_of_moves):
+        possible_moves = _board.get_possible_moves(current_player)
+        if not possible_moves:
+            break
+        socket = rng.choice(possible_moves)
+        if current_player == PlayerNumber.ONE:
+            _board.set_p1_marble_at_socket(socket)
+            current_player = PlayerNumber.TWO
+        else:
+            _board.set_p2_marble_at_socket(socket)
+            current_player = PlayerNumber.ONE
+    return current_player
+
+
+def measure(number_of_boards: int) -> None:
+    """Times both implementations on the same positions and prints the speedup."""
+    object_time = 0.0
+    bitboard_time = 0.0
+    rng = random.Random(SEED)
+
+    for board_seed in range(number_of_boards):
+        _board = BoardMaker.get_standard_board(board_seed)
+        current_player = play_random_moves(
+            _board, rng.randrange(POSITIONS_PER_BOARD), rng
+        )
+
+        assert object_model_possible_moves(
+            _board, current_player
+        ) == _board.get_possible_moves(current_player)
+        assert object_model_scores(_board) == get_scores(_board)
+
+        object_time += timeit.timeit(
+            lambda b=_board, p=current_player: (
+                object_model_possible_moves(b, p),
+                object_model_scores(b),
+            ),
+            number=REPETITIONS,
+        )
+        bitboard_time += timeit.timeit(
+            lambda b=_board, p=current_player: (
+                b.get_possible_moves(p),
+                get_scores(b),
+            ),
+            number=REPETITIONS,
+        )
+
+    calls = number_of_boards * REPETITIONS
+    print(f"Object model: {object_time / calls * 1e6:.1f} us per position")
+    print(f"BitBoard:     {bitboard_time / calls * 1e6:.1f} us per position")
+    print(f"Speedup:      {object_time / bitboard_time:.1f}x")
+
+
+if __name__ == "__main__":
+    measure(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -0,0 +1,81 @@
+"""
+Plays the same games with and without the endgame solver on the side of player 1,
+against the same fixed-depth MinimaxPlayer, and prints the average final score margin
+of player 1, the time taken and the moves the solver played.
+
+Usage: `python -m benchmarks.endgame [endgame_nodes] [number_of_games] [depth]`
+"""
+
+import random
+import sys
+import time
+
+from board import get_scores
+from game import Kulami
+from player import MinimaxPlayer
+
+
+class CountingMinimaxPlayer(MinimaxPlayer):
+    """MinimaxPlayer that counts the moves it found by solving the endgame."""
+
+    def __init__(self, depth: int, endgame_nodes: int) -> None:
+        super().__init__(depth, endgame_nodes=endgame_nodes)
+        self.solved_moves = 0
+        self.solved_seconds = 0.0
+
+    def choose_move(self, game_info):
+        start_time = time.perf_counter()
+        move = super().choose_move(game_info)
+        if self.solved_endgame:
+            self.solved_moves += 1
+            self.solved_seconds += time.perf_counter() - start_time
+        return move
+
+
+def play_margin(player1: MinimaxPlayer, player2: MinimaxPlayer, seed: int) -> int:
+    """Plays the game of the seed, like play_match, and returns the final score margin."""
+    player_seeds = random.Random(seed)
+    player1.set_seed(player_seeds.getrandbits(64))
+    player2.set_seed(player_seeds.getrandbits(64))
+
+    game = Kulami(player1, player2)
+    game.initialize_standard_board(seed)
+    game.play()
+
+    player1_score, player2_score = get_scores(game.board)
+    return player1_score - player2_score
+
+
+def measure(endgame_nodes: int, number_of_games: int, depth: int) -> None:
+    """Plays every game twice and prints the margins and times of both versions."""
+    solver = CountingMinimaxPlayer(depth, endgame_nodes)
+    margins = {"Fixed depth": 0, "Endgame solver": 0}
+    seconds = {"Fixed depth": 0.0, "Endgame solver": 0.0}
+
+    for seed in range(number_of_games):
+        for name, player1 in (
+            ("Fixed depth", MinimaxPlayer(depth)),
+            ("Endgame solver", solver),
+        ):
+            start_time = time.perf_counter()
+            margins[name] += play_margin(player1, MinimaxPlayer(depth), seed)
+            seconds[name] += time.perf_counter() - start_time
+
+    for name, margin in margins.items():
+        print(
+            f"{name + ':':16}{margin / number_of_games:+.2f} points per game, "
+            f"{seconds[name] / number_of_games:.3f} s per game"
+        )
+    if solver.solved_moves:
+        print(
+            f"Solved moves: {solver.solved_moves / number_of_games:.1f} per game, "
+            f"{solver.solved_seconds / solver.solved_moves * 1000:.1f} ms each"
+        )
+
+
+if __name__ == "__main__":
+    measure(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 3,
+    )
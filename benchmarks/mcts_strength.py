@@ -0,0 +1,61 @@
+"""
+Plays MCTSPlayer against the time-budgeted MinimaxPlayer with the same time per move,
+each playing half of the games as player 1, and prints the results and the playouts per second.
+
+Usage: `python -m benchmarks.mcts_strength [time_ms] [number_of_games]`
+"""
+
+import sys
+import time
+
+from enums import PlayerNumber
+from match_maker import play_match
+from player import MCTSPlayer, MinimaxPlayer
+
+
+class MeasuredMCTSPlayer(MCTSPlayer):
+    """MCTSPlayer that adds up its playouts and search time over all its moves."""
+
+    def __init__(self, time_ms: float) -> None:
+        super().__init__(time_ms=time_ms)
+        self.total_playouts = 0
+        self.total_seconds = 0.0
+
+    def get_next_move(self, game_info):
+        start_time = time.perf_counter()
+        move = super().get_next_move(game_info)
+        self.total_seconds += time.perf_counter() - start_time
+        self.total_playouts += self.playouts
+        return move
+
+
+def measure(time_ms: float, number_of_games: int) -> None:
+    """Plays the games and prints the wins of each player."""
+    mcts = MeasuredMCTSPlayer(time_ms)
+    minimax = MinimaxPlayer(time_ms=time_ms)
+
+    wins = {"MCTS": 0, "Minimax": 0, "Draws": 0}
+    for seed in range(number_of_games):
+        if seed % 2 == 0:
+            winner = play_match(mcts, minimax, seed)
+            mcts_number = PlayerNumber.ONE
+        else:
+            winner = play_match(minimax, mcts, seed)
+            mcts_number = PlayerNumber.TWO
+
+        if winner is None:
+            wins["Draws"] += 1
+        elif winner == mcts_number:
+            wins["MCTS"] += 1
+        else:
+            wins["Minimax"] += 1
+
+    print(f"{mcts} vs {minimax}: {wins}")
+    print(f"MCTS playouts per second: {mcts.total_playouts / mcts.total_seconds:.0f}")
+
+
+if __name__ == "__main__":
+    measure(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 4,
+    )
@@ -0,0 +1,71 @@
+"""
+Plays the same games without a profiler hook, with a CProfileHook on every turn
+and with a CProfileHook on whole games, and prints the time each takes.
+Checks that a whole-game hook writes one file per game, which holds every turn.
+
+Usage: `python -m benchmarks.profiler_overhead [number_of_games] [depth]`
+"""
+
+import os
+import pstats
+import sys
+import tempfile
+import time
+
+from game import Kulami
+from player import MinimaxPlayer
+from profiling import CProfileHook
+
+
+def play_game(seed: int, depth: int, profiler: CProfileHook = None) -> Kulami:
+    """Plays the game of the seed between two MinimaxPlayers and returns it."""
+    game = Kulami(MinimaxPlayer(depth, seed=seed), MinimaxPlayer(depth, seed=seed + 1))
+    game.initialize_standard_board(seed)
+    game.play(profiler=profiler)
+    return game
+
+
+def get_turns_profiled(path: str) -> int:
+    """Get the number of turns recorded in a .prof file."""
+    return sum(
+        calls
+        for (_, _, function), (calls, *_) in pstats.Stats(path).stats.items()
+        if function == "player_turn"
+    )
+
+
+def check_whole_games(seed: int, depth: int) -> None:
+    """Checks that a whole-game hook writes one file, which holds every turn of the game."""
+    with tempfile.TemporaryDirectory() as directory:
+        game = play_game(seed, depth, CProfileHook(directory, whole_games=True))
+        files = os.listdir(directory)
+        assert len(files) == 1, f"Expected one file, got {files}"
+        turns_profiled = get_turns_profiled(os.path.join(directory, files[0]))
+        assert turns_profiled == game.turn, f"{turns_profiled} of {game.turn} turns"
+
+
+def measure(number_of_games: int, depth: int) -> None:
+    """Plays the games with every kind of hook and prints the time per game."""
+    check_whole_games(0, depth)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, profiler in (
+            ("No profiler", None),
+            ("Every turn", CProfileHook(os.path.join(directory, "turns"))),
+            (
+                "Whole games",
+                CProfileHook(os.path.join(directory, "games"), whole_games=True),
+            ),
+        ):
+            start_time = time.perf_counter()
+            for seed in range(number_of_games):
+                play_game(seed, depth, profiler)
+            elapsed = time.perf_counter() - start_time
+            print(f"{name + ':':13}{elapsed / number_of_games:.3f} s per game")
+
+
+if __name__ == "__main__":
+    measure(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 2,
+    )
@@ -0,0 +1,54 @@
+"""
+Plays the same games twice with a new search cache on the side of player 1
+and prints the time taken, the nodes searched and the cache hit rate of each pass,
+after a pass without the cache for comparison.
+
+Usage: `python -m benchmarks.search_cache [number_of_games] [depth]`
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from match_maker import play_match
+from player import MinimaxPlayer
+from search_cache import SearchCache
+
+
+def play_pass(name: str, player1: MinimaxPlayer, number_of_games: int) -> None:
+    """Plays the games of the seeds and prints the measurements of player 1."""
+    start_time = time.perf_counter()
+    for seed in range(number_of_games):
+        play_match(player1, MinimaxPlayer(player1.depth), seed)
+    elapsed = time.perf_counter() - start_time
+
+    stats = player1.total_stats
+    print(
+        f"{name + ':':14}{elapsed / number_of_games:.3f} s per game, "
+        f"{stats.nodes / stats.moves:.0f} nodes per move, "
+        f"{stats.get_cache_hit_rate():.1%} cache hit rate"
+    )
+
+
+def measure(number_of_games: int, depth: int) -> None:
+    """Plays the games without the cache, then twice with it."""
+    play_pass("No cache", MinimaxPlayer(depth, collect_stats=True), number_of_games)
+
+    with tempfile.TemporaryDirectory() as directory:
+        with SearchCache(os.path.join(directory, "search.cache")) as cache:
+            for name in ("First pass", "Second pass"):
+                player1 = MinimaxPlayer(depth, collect_stats=True, search_cache=cache)
+                play_pass(name, player1, number_of_games)
+            print(
+                f"Cache over both passes: {len(cache)} entries, "
+                f"{cache.hits} hits, {cache.misses} misses "
+                f"({cache.get_hit_rate():.1%} hit rate)"
+            )
+
+
+if __name__ == "__main__":
+    measure(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 3,
+    )
@@ -0,0 +1,56 @@
+"""
+Measures the time a fresh interpreter takes to import the engine and search its first move,
+which every spawned worker process pays before it can play.
+
+Usage: `python -m benchmarks.startup [repetitions]`
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+
+FIRST_MOVE = """
+import sys
+from board import BoardMaker
+from data import GameInfo
+from enums import PlayerNumber
+from player import MinimaxPlayer
+
+board = BoardMaker.get_standard_board(0)
+# MinimaxPlayer does not search the first two moves, so the move timed is the third one
+for player in (PlayerNumber.ONE, PlayerNumber.TWO):
+    board.make_move(board.get_possible_moves(player)[0].index)
+moves = board.get_possible_moves(PlayerNumber.ONE)
+MinimaxPlayer(2, seed=0).get_next_move(GameInfo(PlayerNumber.ONE, moves, board, 2))
+print(",".join(sorted(name for name in ("drawer", "bash_color") if name in sys.modules)))
+"""
+
+
+def time_interpreter(code: str) -> tuple[float, str]:
+    """Runs the code in a fresh interpreter and returns the time taken and its output."""
+    start_time = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    )
+    return time.perf_counter() - start_time, result.stdout.strip()
+
+
+def measure(repetitions: int) -> None:
+    """Prints the median time of an empty interpreter and of the first move."""
+    empty_times = [time_interpreter("pass")[0] for _ in range(repetitions)]
+    first_move_times = []
+    for _ in range(repetitions):
+        seconds, rendering_modules = time_interpreter(FIRST_MOVE)
+        first_move_times.append(seconds)
+
+    empty = statistics.median(empty_times)
+    first_move = statistics.median(first_move_times)
+    print(f"Empty interpreter: {empty * 1000:.1f} ms")
+    print(f"First move:        {first_move * 1000:.1f} ms")
+    print(f"Engine startup:    {(first_move - empty) * 1000:.1f} ms")
+    print(f"Rendering modules imported: {rendering_modules or 'none'}")
+
+
+if __name__ == "__main__":
+    measure(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,296 @@
+"""
+Measures the hot paths of the engine on fixed boards and positions,
+writes the results as JSON and compares them with a stored baseline.
+
+Usage: `python -m benchmarks.suite [--output PATH] [--baseline PATH] [--save-baseline]
+[--tolerance FRACTION] [--runs N]`
+
+The baseline is only meaningful on the machine that measured it:
+run with `--save-baseline` to replace it after a deliberate change.
+The exit status is 1 if any measurement is worse than the baseline by more than the tolerance.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from benchmarks.bitboard_speedup import play_random_moves
+from board import BoardMaker, VirtualBoard
+from data import GameInfo
+from match_maker import play_match
+from player import MinimaxPlayer, NaivePlayer, Player, RandomPlayer
+
+SEED = 0
+NUMBER_OF_BOARDS = 20
+MAX_RANDOM_MOVES = 30
+REPEATS = 5
+MINIMAX_DEPTHS = (1, 2, 3, 4)
+# Plain minimax grows with the branching factor to the depth, so deeper searches use fewer positions
+MINIMAX_POSITIONS = {1: 20, 2: 20, 3: 20, 4: 5}
+# Random games are short, many of them are needed for a stable rate
+NUMBER_OF_GAMES = {"random_games": 200, "minimax_games": 20}
+GAME_REPEATS = 10
+# Calls per repeat of the moves that take microseconds, which a single call cannot time
+FAST_MOVE_CALLS = 100
+
+DEFAULT_OUTPUT = "results/benchmarks.json"
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_RUNS = 3
+
+
+def get_positions() -> list[GameInfo]:
+    """Get the positions measured by the suite, which are the same on every run."""
+    rng = random.Random(SEED)
+    positions = []
+    for board_seed in range(NUMBER_OF_BOARDS):
+        _board = BoardMaker.get_standard_board(board_seed)
+        number_of_moves = rng.randrange(2, MAX_RANDOM_MOVES)
+        current_player = play_random_moves(_board, number_of_moves, rng)
+        possible_moves = _board.get_possible_moves(current_player)
+        if possible_moves:
+            positions.append(
+                GameInfo(current_player, possible_moves, _board, number_of_moves)
+            )
+    return positions
+
+
+def best_time(function, number: int, repeats: int = REPEATS) -> float:
+    """Get the shortest time of the repeated runs of the function called number times, per call."""
+    best = float("inf")
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, time.perf_counter() - start_time)
+    return best / number
+
+
+def best_rate(function, repeats: int = REPEATS) -> float:
+    """Get the highest rate of the repeated runs of the function, which returns the work done."""
+    best = 0.0
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        work = function()
+        best = max(best, work / (time.perf_counter() - start_time))
+    return best
+
+
+def metric(value: float, unit: str, higher_is_better: bool) -> dict:
+    """Get the JSON record of a measurement."""
+    return {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+
+def measure_board_generation() -> dict:
+    """Standard boards generated per second."""
+    seeds = iter(range(10**9))
+    seconds = best_time(
+        lambda: BoardMaker.get_standard_board(next(seeds)), NUMBER_OF_BOARDS
+    )
+    return metric(1 / seconds, "boards/s", True)
+
+
+def measure_position_latency(positions: list[GameInfo], name: str) -> dict:
+    """
+    Microseconds per call of get_possible_moves, or of evaluate_moves
+    on all the moves of the position, over all the positions.
+    """
+    calls = []
+    for game_info in positions:
+        if name == "get_possible_moves":
+            calls.append(
+                lambda i=game_info: i.board.get_possible_moves(i.current_player)
+            )
+        else:
+            vboard = VirtualBoard(game_info.board, game_info.current_player)
+            calls.append(
+                lambda v=vboard, i=game_info: v.evaluate_moves(i.possible_moves)
+            )
+
+    def call_all() -> None:
+        for call in calls:
+            call()
+
+    return metric(best_time(call_all, 100) / len(calls) * 1e6, "us", False)
+
+
+def measure_minimax_nodes(positions: list[GameInfo], depth: int) -> dict:
+    """Nodes per second of the plain minimax search at the given depth."""
+    player = MinimaxPlayer(depth, alpha_beta=False, seed=SEED)
+
+    def search_all() -> int:
+        nodes = 0
+        for game_info in positions[: MINIMAX_POSITIONS[depth]]:
+            player.get_next_move(game_info)
+            nodes += player.nodes_searched
+        return nodes
+
+    return metric(best_rate(search_all), "nodes/s", True)
+
+
+def measure_move_latency(
+    positions: list[GameInfo], player: Player, number: int = 1, repeats: int = REPEATS
+) -> dict:
+    """Microseconds per move chosen by the player, over all the positions."""
+    seconds = 0.0
+    for game_info in positions:
+        seconds += best_time(
+            lambda i=game_info: player.get_next_move(i), number, repeats
+        )
+    return metric(seconds / len(positions) * 1e6, "us", False)
+
+
+def measure_games(player1_class, player2_class, number_of_games: int) -> dict:
+    """
+    Full games per second between new players of the given classes,
+    so that no run starts with the transposition table of the previous one.
+    """
+
+    def play_all() -> int:
+        player1 = player1_class()
+        player2 = player2_class()
+        for seed in range(number_of_games):
+            play_match(player1, player2, seed)
+        return number_of_games
+
+    return metric(best_rate(play_all, GAME_REPEATS), "games/s", True)
+
+
+# The benchmarks of the suite by name, which take the positions of the suite
+METRICS = {
+    "board_generation": lambda positions: measure_board_generation(),
+    "get_possible_moves": partial(measure_position_latency, name="get_possible_moves"),
+    "evaluate_moves": partial(measure_position_latency, name="evaluate_moves"),
+    **{
+        f"minimax_depth_{depth}": partial(measure_minimax_nodes, depth=depth)
+        for depth in MINIMAX_DEPTHS
+    },
+    "naive_move": lambda positions: measure_move_latency(
+        positions, NaivePlayer(SEED), FAST_MOVE_CALLS
+    ),
+    # Repeated searches would find the positions in the transposition table
+    "minimax_move": lambda positions: measure_move_latency(
+        positions, MinimaxPlayer(3, seed=SEED), repeats=1
+    ),
+    "random_games": lambda positions: measure_games(
+        RandomPlayer, RandomPlayer, NUMBER_OF_GAMES["random_games"]
+    ),
+    "minimax_games": lambda positions: measure_games(
+        lambda: MinimaxPlayer(2), NaivePlayer, NUMBER_OF_GAMES["minimax_games"]
+    ),
+}
+
+
+def measure_metric(name: str) -> dict:
+    """Runs the benchmark of the name on the positions of the suite and returns its measurement."""
+    return METRICS[name](get_positions())
+
+
+def measure_in_new_process(name: str) -> dict:
+    """
+    Runs the benchmark of the name in a new process, so that its measurement does not depend
+    on the memory, the garbage collector or the tables left by the benchmarks run before it.
+    """
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(measure_metric, name).result()
+
+
+def run_suite(runs: int = DEFAULT_RUNS) -> dict:
+    """
+    Runs every benchmark the given number of times and returns the best measurements,
+    with the environment they ran in.
+    The runs of the whole suite follow each other, so a slow period of the machine
+    only affects the measurements of one of them.
+    """
+    metrics = {}
+    for _ in range(runs):
+        for name in METRICS:
+            current = measure_in_new_process(name)
+            best = metrics.get(name)
+            if (
+                best is None
+                or (current["value"] > best["value"]) == current["higher_is_better"]
+            ):
+                metrics[name] = current
+
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "metrics": metrics,
+    }
+
+
+def write_results(results: dict, path: str) -> None:
+    """Writes the results as JSON, creating the directory if needed."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+        file.write("\n")
+
+
+def compare_results(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Prints every measurement with its change from the baseline
+    and returns the names of those worse than the baseline by more than the tolerance.
+    """
+    regressions = []
+    for name, current in results["metrics"].items():
+        line = f"{name:22}{current['value']:14.3f} {current['unit']:8}"
+
+        previous = baseline["metrics"].get(name)
+        if previous is not None:
+            change = current["value"] / previous["value"] - 1
+            # Positive when the measurement got worse
+            regression = -change if current["higher_is_better"] else change
+            line += f"{previous['value']:14.3f} {change:+8.1%}"
+            if regression > tolerance:
+                line += "  REGRESSION"
+                regressions.append(name)
+
+        print(line)
+    return regressions
+
+
+def main() -> int:
+    """Runs the suite, writes the results and compares them with the baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    args = parser.parse_args()
+
+    results = run_suite(args.runs)
+    write_results(results, args.output)
+
+    baseline = {"metrics": {}}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    print(f"{'':22}{'current':>14} {'':8}{'baseline':>14} {'change':>8}")
+    regressions = compare_results(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        write_results(results, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if regressions:
+        print(f"{len(regressions)} regressions beyond {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,329 @@
+"""
+This file contains the BitBoard class, which stores the state of the game as integer bitmasks.
+Bit i of every mask corresponds to the socket at index i of the board's list of sockets.
+"""
+
+import random
+from constants import MARBLES_PER_PLAYER
+from enums import PlayerNumber, SocketState
+from tile import Socket, Tile
+
+NO_SOCKET = -1
+ZOBRIST_SEED = 20230815
+
+
+def iterate_bits(mask: int):
+    """Yields the index of every bit set in the mask, from lowest to highest."""
+    while mask:
+        lowest_bit = mask & -mask
+        yield lowest_bit.bit_length() - 1
+        mask ^= lowest_bit
+
+
+# pylint: disable=too-many-instance-attributes
+class BitBoard:
+    """
+    Represents the marbles on the board as bitmasks.
+    Legal moves and scores are computed with mask operations and popcounts
+    instead of walking the tiles and sockets.
+    """
+
+    def __init__(self, sockets: list[Socket], tiles: list[Tile]) -> None:
+        self.number_of_sockets = len(sockets)
+        self.full_mask = (1 << self.number_of_sockets) - 1
+
+        index_of_socket = {socket: i for i, socket in enumerate(sockets)}
+
+        self.tile_masks: list[int] = []
+        self.tile_points: list[int] = []
+        self.socket_tile: list[int] = [0] * self.number_of_sockets
+        for tile_index, tile in enumerate(tiles):
+            mask = 0
+            for socket in tile.sockets:
+                socket_index = index_of_socket[socket]
+                mask |= 1 << socket_index
+                self.socket_tile[socket_index] = tile_index
+            self.tile_masks.append(mask)
+            self.tile_points.append(tile.get_points())
+
+        self.socket_tile_masks: list[int] = [
+            self.tile_masks[tile_index] for tile_index in self.socket_tile
+        ]
+
+        # Rows and columns are numbered by their y and x coordinates
+        number_of_lines = 1 + max(
+            (max(socket.position.x, socket.position.y) for socket in sockets),
+            default=0,
+        )
+        self.socket_rows: list[int] = [socket.position.y for socket in sockets]
+        self.socket_columns: list[int] = [socket.position.x for socket in sockets]
+        self.row_masks: list[int] = [0] * number_of_lines
+        self.column_masks: list[int] = [0] * number_of_lines
+        for i, socket in enumerate(sockets):
+            self.row_masks[socket.position.y] |= 1 << i
+            self.column_masks[socket.position.x] |= 1 << i
+
+        # Zobrist keys are the same for every board,
+        # the layout key makes the hashes of different boards unrelated
+        key_generator = random.Random(ZOBRIST_SEED)
+        self.marble_keys: list[list[int]] = [
+            [key_generator.getrandbits(64) for _ in sockets] for _ in range(2)
+        ]
+        self.last_marble_keys: list[list[int]] = [
+            [key_generator.getrandbits(64) for _ in sockets] for _ in range(2)
+        ]
+        self.player_two_key = key_generator.getrandbits(64)
+        # Opening books and search caches store the layout key on disk,
+        # so it is derived from the bytes of the layout, not from the hash of the interpreter:
+        # random seeds bytes with their SHA-512 digest on every platform and Python version
+        layout = bytes(
+            value
+            for socket, tile_index in zip(sockets, self.socket_tile)
+            for value in (socket.position.x, socket.position.y, tile_index)
+        )
+        self.layout_key = random.Random(layout).getrandbits(64)
+
+        # Index 0 is player 1 and index 1 is player 2
+        self.player_masks: list[int] = [0, 0]
+        self.last_marbles: list[int] = [NO_SOCKET, NO_SOCKET]
+        self.player_to_move = 0
+        self.empty_mask = self.full_mask
+        self.empty_row_masks: list[int] = self.row_masks.copy()
+        self.empty_column_masks: list[int] = self.column_masks.copy()
+
+        # Number of player 1 marbles minus number of player 2 marbles on each tile
+        self.tile_balances: list[int] = [0] * len(tiles)
+        # Player 1 score minus player 2 score
+        self.score_difference = 0
+        self.hash = self.layout_key
+
+        # Three entries per move made: previous last marble of the player, hash, score change
+        self.undo_stack: list[int] = []
+
+        for i, socket in enumerate(sockets):
+            if socket.state != SocketState.EMPTY:
+                self.set_state(i, socket.state)
+
+        if self.player_masks[0].bit_count() > self.player_masks[1].bit_count():
+            self.set_player_to_move(PlayerNumber.TWO)
+
+    @staticmethod
+    def get_player_index(state: SocketState) -> int:
+        """Get the index of the player owning a marble in the given state."""
+        if state in (SocketState.PLAYER1, SocketState.PLAYER1_LAST):
+            return 0
+        return 1
+
+    def get_score_change(self, socket_index: int, player_index: int) -> int:
+        """
+        Get the change of the score difference if the player
+        placed a marble in the specified socket.
+        """
+        tile_index = self.socket_tile[socket_index]
+
+        old_balance = self.tile_balances[tile_index]
+        new_balance = old_balance + (1 if player_index == 0 else -1)
+
+        old_owner = (old_balance > 0) - (old_balance < 0)
+        new_owner = (new_balance > 0) - (new_balance < 0)
+        return (new_owner - old_owner) * self.tile_points[tile_index]
+
+    def get_move_evaluations(self, moves: list[int]) -> list[int]:
+        """
+        Get the score difference after each move of the player to move, given by socket index,
+        without making the moves.
+        """
+        player_index = self.player_to_move
+        return [
+            self.score_difference + self.get_score_change(socket_index, player_index)
+            for socket_index in moves
+        ]
+
+    def set_state(self, socket_index: int, state: SocketState) -> None:
+        """
+        Puts a marble in the given state at the specified empty socket.
+        Setting a *_LAST state replaces the previous last marble of that player.
+        Unlike make_move, it does not change the player to move nor push an undo record.
+        """
+        player_index = BitBoard.get_player_index(state)
+        bit = 1 << socket_index
+
+        self.score_difference += self.get_score_change(socket_index, player_index)
+        self.tile_balances[self.socket_tile[socket_index]] += (
+            1 if player_index == 0 else -1
+        )
+
+        self.empty_mask &= ~bit
+        self.empty_row_masks[self.socket_rows[socket_index]] &= ~bit
+        self.empty_column_masks[self.socket_columns[socket_index]] &= ~bit
+        self.player_masks[player_index] |= bit
+        self.hash ^= self.marble_keys[player_index][socket_index]
+
+        if state in (SocketState.PLAYER1_LAST, SocketState.PLAYER2_LAST):
+            previous_last = self.last_marbles[player_index]
+            if previous_last != NO_SOCKET:
+                self.hash ^= self.last_marble_keys[player_index][previous_last]
+            self.last_marbles[player_index] = socket_index
+            self.hash ^= self.last_marble_keys[player_index][socket_index]
+
+    def set_player_to_move(self, player: PlayerNumber) -> None:
+        """Sets the player whose marble the next move places."""
+        player_index = player.value - 1
+        if player_index != self.player_to_move:
+            self.player_to_move = player_index
+            self.hash ^= self.player_two_key
+
+    def make_move(self, socket_index: int) -> None:
+        """
+        Places a marble of the player to move in the specified empty socket,
+        which becomes their last marble, and gives the turn to the other player.
+        Does not check that the move is legal.
+        """
+        player_index = self.player_to_move
+        tile_index = self.socket_tile[socket_index]
+        bit = 1 << socket_index
+
+        previous_last = self.last_marbles[player_index]
+        score_change = self.get_score_change(socket_index, player_index)
+
+        self.undo_stack.append(previous_last)
+        self.undo_stack.append(self.hash)
+        self.undo_stack.append(score_change)
+
+        self.empty_mask &= ~bit
+        self.empty_row_masks[self.socket_rows[socket_index]] &= ~bit
+        self.empty_column_masks[self.socket_columns[socket_index]] &= ~bit
+        self.player_masks[player_index] |= bit
+
+        self.tile_balances[tile_index] += 1 if player_index == 0 else -1
+        self.score_difference += score_change
+
+        last_marble_keys = self.last_marble_keys[player_index]
+        self.hash ^= (
+            self.marble_keys[player_index][socket_index]
+            ^ last_marble_keys[socket_index]
+            ^ self.player_two_key
+        )
+        if previous_last != NO_SOCKET:
+            self.hash ^= last_marble_keys[previous_last]
+
+        self.last_marbles[player_index] = socket_index
+        self.player_to_move = 1 - player_index
+
+    def unmake_move(self) -> None:
+        """Takes back the last move made with make_move."""
+        score_change = self.undo_stack.pop()
+        previous_hash = self.undo_stack.pop()
+        previous_last = self.undo_stack.pop()
+
+        player_index = 1 - self.player_to_move
+        socket_index = self.last_marbles[player_index]
+        bit = 1 << socket_index
+
+        self.empty_mask |= bit
+        self.empty_row_masks[self.socket_rows[socket_index]] |= bit
+        self.empty_column_masks[self.socket_columns[socket_index]] |= bit
+        self.player_masks[player_index] &= ~bit
+
+        self.tile_balances[self.socket_tile[socket_index]] -= (
+            1 if player_index == 0 else -1
+        )
+        self.score_difference -= score_change
+        self.hash = previous_hash
+
+        self.last_marbles[player_index] = previous_last
+        self.player_to_move = player_index
+
+    def get_last_marble(self, player: PlayerNumber) -> int:
+        """Get the socket index of the last marble of the player, or NO_SOCKET."""
+        return self.last_marbles[player.value - 1]
+
+    def get_possible_moves_mask(self, current_player: PlayerNumber) -> int:
+        """Get the mask of the sockets the current player can place a marble in."""
+        player1_last, player2_last = self.last_marbles
+
+        if player1_last == NO_SOCKET and player2_last == NO_SOCKET:  # First turn
+            return self.empty_mask
+
+        opponent_last = (
+            player2_last if current_player == PlayerNumber.ONE else player1_last
+        )
+        if opponent_last != NO_SOCKET:
+            # Only the empty sockets in the row and column of the opponent's last marble
+            mask = (
+                self.empty_row_masks[self.socket_rows[opponent_last]]
+                | self.empty_column_masks[self.socket_columns[opponent_last]]
+            )
+        else:
+            mask = self.empty_mask
+
+        if player1_last != NO_SOCKET:
+            mask &= ~self.socket_tile_masks[player1_last]
+        if player2_last != NO_SOCKET:
+            mask &= ~self.socket_tile_masks[player2_last]
+
+        return mask
+
+    def has_any_move(self, current_player: PlayerNumber) -> bool:
+        """Check if the current player can place a marble anywhere."""
+        return self.get_possible_moves_mask(current_player) != 0
+
+    def get_scores(self) -> tuple[int, int]:
+        """Calculates the scores of the players"""
+        player1_mask, player2_mask = self.player_masks
+        player1_score = 0
+        player2_score = 0
+
+        for tile_mask, points in zip(self.tile_masks, self.tile_points):
+            difference = (player1_mask & tile_mask).bit_count() - (
+                player2_mask & tile_mask
+            ).bit_count()
+            if difference > 0:
+                player1_score += points
+            elif difference < 0:
+                player2_score += points
+
+        return (player1_score, player2_score)
+
+    def get_score_bounds(self) -> tuple[int, int]:
+        """
+        Get the lowest and highest score difference the game can still end with.
+        A tile can at most receive a marble in each of its empty sockets,
+        as long as the player has marbles left, so its balance can only swing that far.
+        """
+        player1_marbles_left = MARBLES_PER_PLAYER - self.player_masks[0].bit_count()
+        player2_marbles_left = MARBLES_PER_PLAYER - self.player_masks[1].bit_count()
+
+        lowest = 0
+        highest = 0
+        for tile_mask, points, balance in zip(
+            self.tile_masks, self.tile_points, self.tile_balances
+        ):
+            empty_sockets = (tile_mask & self.empty_mask).bit_count()
+            best_balance = balance + min(empty_sockets, player1_marbles_left)
+            worst_balance = balance - min(empty_sockets, player2_marbles_left)
+            highest += points * ((best_balance > 0) - (best_balance < 0))
+            lowest += points * ((worst_balance > 0) - (worst_balance < 0))
+
+        return (lowest, highest)
+
+    def compute_hash(self) -> int:
+        """
+        Calculates the Zobrist hash of the position from scratch.
+        It depends on the marbles of both players, their last marbles and the player to move.
+        The hash kept up to date by every move is always equal to it.
+        """
+        position_hash = self.layout_key
+
+        for player_index in (0, 1):
+            for socket_index in iterate_bits(self.player_masks[player_index]):
+                position_hash ^= self.marble_keys[player_index][socket_index]
+
+            last_marble = self.last_marbles[player_index]
+            if last_marble != NO_SOCKET:
+                position_hash ^= self.last_marble_keys[player_index][last_marble]
+
+        if self.player_to_move == 1:
+            position_hash ^= self.player_two_key
+
+        return position_hash
@@ -3,35 +3,54 @@ This file contains the Board class, which is used to represent the board of the
 """
 
 import random
+from typing import TYPE_CHECKING
+from bitboard import BitBoard, NO_SOCKET, iterate_bits
 from constants import BOARD_AVAILABLE_SIZE, MAX_BOARD_SIZE
-
-from drawer import BoardDrawer
-from enums import PlayerNumber, TileOwner
+from enums import PlayerNumber
+from game_state import GameState
 from position import Position
-from tile import QuantumTile, QuantumTileMaker, Socket, Tile, SocketState
+from tile import Placement, QuantumTile, QuantumTileMaker, Socket, Tile, SocketState
+
+# The board pool code is only loaded by the callers that read a pool
+if TYPE_CHECKING:
+    from board_pool import BoardPool
 
 RANDOM_MULTIPLIER = 0.001
 
-seed = random.randrange(1e12)
-random.seed(seed)
-with open("seed.txt", "a", encoding="utf-8") as file:
-    file.write(str(seed) + "\n")
+# Indexed like the players in BitBoard: 0 is player 1 and 1 is player 2
+PLAYERS = (PlayerNumber.ONE, PlayerNumber.TWO)
+MARBLE_STATES = (SocketState.PLAYER1, SocketState.PLAYER2)
+LAST_MARBLE_STATES = (SocketState.PLAYER1_LAST, SocketState.PLAYER2_LAST)
 
 
+# pylint: disable=too-many-instance-attributes
 class Board:
     """
     Represents the board of the game.
+    The random choices made while placing the tiles come from rng,
+    so a board generated from a seeded random.Random does not depend on anything else.
     """
 
-    def __init__(self, size: int) -> None:
+    def __init__(self, size: int, rng: random.Random = None) -> None:
         self.available_size: int = size
-        self.center = Position(size // 2, size // 2)
+        self.rng = rng if rng is not None else random.Random()
+        self.center = Position.get(size // 2, size // 2)
         self.max_board_size = MAX_BOARD_SIZE
 
         self.tiles: list[Tile] = []
 
         self.list_of_sockets: list[Socket] = []
 
+        self.socket_grid: list[list[Socket]] = []
+        self.tile_id_grid: list[list[int]] = []
+
+        # Kept up to date while placing tiles, see get_board_bit_mask
+        self.occupancy_mask = 0
+        # min_x, max_x, min_y and max_y of the placed tiles
+        self.bounding_box = (size, 0, size, 0)
+
+        self.build_grid_index()
+
     def fit_to_max_board_size(self) -> None:
         """
         Fit the board to the max board size.
@@ -43,13 +62,42 @@ class Board:
             min_x = min(min_x, socket.position.x)
             min_y = min(min_y, socket.position.y)
 
+        # Positions are immutable, so every socket gets a shifted one
         for socket in self.list_of_sockets:
-            socket.position.x -= min_x
+            socket.position = Position.get(
+                socket.position.x - min_x, socket.position.y - min_y
+            )
         self.available_size = self.max_board_size
 
-        for socket in self.list_of_sockets:
-            socket.position.y -= min_y
-        self.available_size = self.max_board_size
+        self.build_grid_index()
+
+    def build_grid_index(self) -> None:
+        """
+        Build the grids mapping every (x, y) coordinate
+        to its socket and to the id of its tile,
+        and recompute the occupancy mask and the bounding box.
+        """
+        self.socket_grid = [
+            [None] * self.available_size for _ in range(self.available_size)
+        ]
+        self.tile_id_grid = [
+            [-1] * self.available_size for _ in range(self.available_size)
+        ]
+
+        for tile in self.tiles:
+            for socket in tile.sockets:
+                self.socket_grid[socket.position.x][socket.position.y] = socket
+                self.tile_id_grid[socket.position.x][socket.position.y] = tile.id
+
+        self.occupancy_mask = self.get_board_bit_mask()
+        self.bounding_box = (self.available_size, 0, self.available_size, 0)
+        for tile in self.tiles:
+            self.extend_bounding_box(
+                Placement.from_positions(
+                    tuple(socket.position for socket in tile.sockets),
+                    self.available_size,
+                )
+            )
 
     def get_sorted_positions(self) -> list[Position]:
         """
@@ -58,11 +106,15 @@ class Board:
         sorted_positions = []
         for x in range(self.available_size):
             for y in range(self.available_size):
-                sorted_positions.append(Position(x, y))
+                sorted_positions.append(Position.get(x, y))
         sorted_positions.sort(key=self.calculate_weight)
         return sorted_positions
 
     def __str__(self) -> str:
+        # Imported here so that playing without drawing does not load the rendering code
+        # pylint: disable=import-outside-toplevel
+        from drawer import BoardDrawer
+
         drawer = BoardDrawer(self)
         drawer.debug = False
         drawer.show_axis = True
@@ -79,12 +131,10 @@ class Board:
         Get the socket at the specified position.
         Returns None if there is no socket at the specified position.
         """
-        for tile in self.tiles:
-            for socket in tile.sockets:
-                if socket.position.x == x and socket.position.y == y:
-                    return socket
+        if x < 0 or x >= self.available_size or y < 0 or y >= self.available_size:
+            return None  # Out of bounds
 
-        return None
+        return self.socket_grid[x][y]
 
     def get_tile_id_at(self, x: int, y: int) -> int:
         """
@@ -94,12 +144,7 @@ class Board:
         if x < 0 or x >= self.available_size or y < 0 or y >= self.available_size:
             return -1  # Out of bounds
 
-        for tile in self.tiles:
-            for socket in tile.sockets:
-                if socket.position.x == x and socket.position.y == y:
-                    return tile.id
-
-        return -1  # No tile at position
+        return self.tile_id_grid[x][y]
 
     def get_board_bit_mask(self) -> int:
         """
@@ -120,70 +165,91 @@ class Board:
         """
         Calculate the weight of a position.
         """
-        random_pos_delta = Position(
-            random.uniform(-1, 1) * RANDOM_MULTIPLIER,
-            random.uniform(-1, 1) * RANDOM_MULTIPLIER,
+        # Not interned, the jittered coordinates are never used again
+        jittered_position = Position(
+            position.x + self.rng.uniform(-1, 1) * RANDOM_MULTIPLIER,
+            position.y + self.rng.uniform(-1, 1) * RANDOM_MULTIPLIER,
         )
-        jittered_position = position + random_pos_delta
 
         return jittered_position.distance_from(self.center)
 
-    def tile_collides_with_board(self, tile: Tile) -> bool:
+    def get_extended_bounding_box(self, placement: Placement) -> tuple[int, ...]:
         """
-        Check if the tile collides with the board.
+        Get the bounding box of the placed tiles and the placement.
         """
-        board_mask = self.get_board_bit_mask()
-        tile_mask = tile.get_bit_mask(self.available_size)
-        return (board_mask | tile_mask) - tile_mask != board_mask
+        min_x, max_x, min_y, max_y = self.bounding_box
+        return (
+            min(min_x, placement.min_x),
+            max(max_x, placement.max_x),
+            min(min_y, placement.min_y),
+            max(max_y, placement.max_y),
+        )
 
-    def placing_tile_exceeds_max_size(self, tile: Tile) -> bool:
+    def extend_bounding_box(self, placement: Placement) -> None:
         """
-        Check if placing the tile exceeds the max board size.
+        Extend the bounding box of the placed tiles to the placement.
         """
-        min_x = self.available_size
-        max_x = 0
-        min_y = self.available_size
-        max_y = 0
+        self.bounding_box = self.get_extended_bounding_box(placement)
 
-        for socket in tile.sockets:
-            min_x = min(min_x, socket.position.x)
-            max_x = max(max_x, socket.position.x)
-            min_y = min(min_y, socket.position.y)
-            max_y = max(max_y, socket.position.y)
+    def placement_collides_with_board(self, placement: Placement) -> bool:
+        """
+        Check if the placement collides with the tiles on the board.
+        """
+        return self.occupancy_mask & placement.mask != 0
 
-        for _tile in self.tiles:
-            for socket in _tile.sockets:
-                min_x = min(min_x, socket.position.x)
-                max_x = max(max_x, socket.position.x)
-                min_y = min(min_y, socket.position.y)
-                max_y = max(max_y, socket.position.y)
+    def placement_exceeds_max_size(self, placement: Placement) -> bool:
+        """
+        Check if adding the placement makes the board larger than the max board size.
+        """
+        min_x, max_x, min_y, max_y = self.get_extended_bounding_box(placement)
 
         return (
             max_x - min_x >= self.max_board_size or max_y - min_y >= self.max_board_size
         )
 
-    def can_place_tile(self, tile: Tile) -> bool:
-        """Check if the tile can be placed on the board."""
-        if self.tile_collides_with_board(tile):
+    def can_place(self, placement: Placement) -> bool:
+        """Check if the placement can be added to the board."""
+        if self.placement_collides_with_board(placement):
             return False
 
-        if self.placing_tile_exceeds_max_size(tile):
+        if self.placement_exceeds_max_size(placement):
             return False
 
         return True
 
+    def can_place_tile(self, tile: Tile) -> bool:
+        """Check if the tile can be placed on the board."""
+        return self.can_place(
+            Placement.from_positions(
+                tuple(socket.position for socket in tile.sockets), self.available_size
+            )
+        )
+
+    def add_placement(self, placement: Placement, tile_id: int) -> None:
+        """
+        Add a tile covering the placement to the board,
+        updating the occupancy mask and the bounding box.
+        """
+        self.tiles.append(QuantumTile.make_tile(placement.positions, tile_id))
+        self.occupancy_mask |= placement.mask
+        self.extend_bounding_box(placement)
+
     def place_qtile(self, qtile: QuantumTile, position: Position) -> bool:
         """
         Place a quantum tile at the specified position.
         Placing the quantum tile means collapsing it into a tile.
+        The placements come from the catalog of the quantum tile,
+        and only the one that fits becomes a tile with sockets.
         """
-        possible_tiles = qtile.get_possible_tiles_at(position)
+        possible_placements = list(
+            qtile.get_catalog_placements(position, self.available_size)
+        )
 
-        random.shuffle(possible_tiles)
+        self.rng.shuffle(possible_placements)
 
-        for tile in possible_tiles:
-            if self.can_place_tile(tile):
-                self.tiles.append(tile)
+        for placement in possible_placements:
+            if self.can_place(placement):
+                self.add_placement(placement, qtile.id)
                 return True
 
         return False
@@ -195,8 +261,11 @@ class Board:
         self.list_of_sockets.clear()
         for tile in self.tiles:
             for socket in tile.sockets:
+                socket.index = len(self.list_of_sockets)
                 self.list_of_sockets.append(socket)
 
+        self.build_grid_index()
+
     def place_all_qtiles(self, qtiles: list[QuantumTile]) -> bool:
         """
         Place all the given quantum tiles on the board.
@@ -204,7 +273,7 @@ class Board:
         """
         positions = self.get_sorted_positions()
 
-        random.shuffle(qtiles)
+        self.rng.shuffle(qtiles)
         for position in positions:
             for qtile in qtiles:
                 if self.place_qtile(qtile, position):
@@ -252,6 +321,7 @@ class BoardInterface:
 
     def __init__(self, _board: Board) -> None:
         self.board = _board
+        self.bitboard = BitBoard(_board.list_of_sockets, _board.tiles)
 
     def get_socket_state(self, position: Position) -> SocketState:
         """
@@ -285,31 +355,63 @@ class BoardInterface:
         if socket.state != SocketState.EMPTY:
             return False
         socket.state = state
+        self.bitboard.set_state(socket.index, state)
         return True
 
+    def make_move(self, socket_index: int) -> None:
+        """
+        Places a marble of the player to move in the socket with the specified index.
+        The previous last marble of the player becomes a normal marble.
+        The move can be taken back with unmake_move.
+        Does not check that the move is legal.
+        """
+        sockets = self.board.list_of_sockets
+        player_index = self.bitboard.player_to_move
+
+        previous_last = self.bitboard.last_marbles[player_index]
+        if previous_last != NO_SOCKET:
+            sockets[previous_last].state = MARBLE_STATES[player_index]
+        sockets[socket_index].state = LAST_MARBLE_STATES[player_index]
+
+        self.bitboard.make_move(socket_index)
+
+    def unmake_move(self) -> None:
+        """
+        Takes back the last move made with make_move.
+        """
+        sockets = self.board.list_of_sockets
+        player_index = 1 - self.bitboard.player_to_move
+
+        sockets[self.bitboard.last_marbles[player_index]].state = SocketState.EMPTY
+        self.bitboard.unmake_move()
+
+        previous_last = self.bitboard.last_marbles[player_index]
+        if previous_last != NO_SOCKET:
+            sockets[previous_last].state = LAST_MARBLE_STATES[player_index]
+
     def set_p1_marble_at_socket(self, socket: Socket) -> bool:
         """
         Changes the PLAYER1_LAST marble to PLAYER1 and
         sets the state of the specified socket to PLAYER1_LAST.
         """
-        for _socket in self.board.list_of_sockets:
-            if _socket.state == SocketState.PLAYER1_LAST:
-                _socket.state = SocketState.PLAYER1
-                break
+        if socket is None or socket.state != SocketState.EMPTY:
+            return False
 
-        return self.set_socket_state(socket, SocketState.PLAYER1_LAST)
+        self.bitboard.set_player_to_move(PlayerNumber.ONE)
+        self.make_move(socket.index)
+        return True
 
     def set_p2_marble_at_socket(self, socket: Socket) -> bool:
         """
         Changes the PLAYER2_LAST marble to PLAYER2 and
         sets the state of the specified socket to PLAYER2_LAST.
         """
-        for _socket in self.board.list_of_sockets:
-            if _socket.state == SocketState.PLAYER2_LAST:
-                _socket.state = SocketState.PLAYER2
-                break
+        if socket is None or socket.state != SocketState.EMPTY:
+            return False
 
-        return self.set_socket_state(socket, SocketState.PLAYER2_LAST)
+        self.bitboard.set_player_to_move(PlayerNumber.TWO)
+        self.make_move(socket.index)
+        return True
 
     def set_p1_marble_at_position(self, position: Position) -> bool:
         """
@@ -340,142 +442,149 @@ class BoardInterface:
         """
         return self.board.get_socket_at(position.x, position.y)
 
-    # pylint: disable=too-many-branches
-    def get_possible_moves(self, current_player: PlayerNumber) -> list[Socket]:
-        """Gets all the possible moves for the current player"""
-
-        all_sockets = self.get_all_sockets()
-
-        player1_last_marble = None
-        player2_last_marble = None
-
-        for socket in all_sockets:
-            if socket.state == SocketState.PLAYER1_LAST:
-                player1_last_marble = socket
-            elif socket.state == SocketState.PLAYER2_LAST:
-                player2_last_marble = socket
-
-        if player1_last_marble is None and player2_last_marble is None:  # First turn
-            return all_sockets
-
-        possible_moves = []
-
-        for socket in all_sockets:
-            if socket.state != SocketState.EMPTY:
-                continue
+    def snapshot(self) -> GameState:
+        """
+        Get an immutable snapshot of the layout and the marbles of the board.
+        BoardInterface.from_snapshot rebuilds an independent board from it.
+        """
+        size = self.board.available_size
+        cells = tuple(
+            socket.position.x * size + socket.position.y
+            for socket in self.get_all_sockets()
+        )
 
-            if (
-                socket.position.x == player1_last_marble.position.x
-                and socket.position.y == player1_last_marble.position.y
-            ):
-                continue
+        return GameState(
+            size,
+            cells,
+            tuple(self.bitboard.socket_tile),
+            tuple(self.bitboard.player_masks),
+            tuple(self.bitboard.last_marbles),
+            self.bitboard.player_to_move,
+        )
 
-            if socket.tile_id == player1_last_marble.tile_id:
-                continue
+    @staticmethod
+    def from_snapshot(state: GameState) -> "BoardInterface":
+        """
+        Rebuild a board from a snapshot.
+        The sockets keep their order, so socket indices refer to the same sockets.
+        """
+        _board = Board(state.size)
+        number_of_tiles = max(state.socket_tiles, default=-1) + 1
+        _board.tiles = [
+            Tile([], QuantumTile.possible_ids[i % len(QuantumTile.possible_ids)])
+            for i in range(number_of_tiles)
+        ]
 
-            if player2_last_marble is not None:  # To handle the second turn
-                if (
-                    socket.position.x == player2_last_marble.position.x
-                    and socket.position.y == player2_last_marble.position.y
-                ):
-                    continue
+        for i, (cell, tile_index) in enumerate(zip(state.cells, state.socket_tiles)):
+            socket = Socket(Position.get(cell // state.size, cell % state.size))
+            socket.set_tile_id(_board.tiles[tile_index].id)
 
-                if socket.tile_id == player2_last_marble.tile_id:
-                    continue
+            for player_index in (0, 1):
+                if state.player_masks[player_index] >> i & 1:
+                    if state.last_marbles[player_index] == i:
+                        socket.state = LAST_MARBLE_STATES[player_index]
+                    else:
+                        socket.state = MARBLE_STATES[player_index]
 
-            if current_player == PlayerNumber.ONE:
-                last_move = player2_last_marble.position
-            else:
-                last_move = player1_last_marble.position
+            _board.tiles[tile_index].sockets.append(socket)
+        _board.initialize_list_of_sockets()
 
-            if socket.position.x == last_move.x or socket.position.y == last_move.y:
-                possible_moves.append(socket)
+        iboard = BoardInterface(_board)
+        iboard.bitboard.set_player_to_move(PLAYERS[state.player_to_move])
+        return iboard
 
-        return possible_moves
+    def get_possible_moves(self, current_player: PlayerNumber) -> list[Socket]:
+        """Gets all the possible moves for the current player"""
+        all_sockets = self.get_all_sockets()
+        mask = self.bitboard.get_possible_moves_mask(current_player)
 
+        return [all_sockets[i] for i in iterate_bits(mask)]
 
-# pylint: enable=too-many-branches
+    def has_any_move(self, current_player: PlayerNumber) -> bool:
+        """Checks if the current player has a possible move, without listing them"""
+        return self.bitboard.has_any_move(current_player)
 
 
 class VirtualBoard:
     """
     Class for making moves and calculating scores without affecting the actual board.
+    Moves are made on the board with make_move and all taken back on exit.
     """
 
     def __init__(self, interface: BoardInterface, current_player: PlayerNumber) -> None:
         self.board = interface
-        self.current_player = current_player
+        self.bitboard = interface.bitboard
+        self.bitboard.set_player_to_move(current_player)
 
-        self.moves_made: list[Position] = []
+        self.number_of_moves_made = 0
 
-        self.player1_last_move: Position = None
-        self.player2_last_move: Position = None
-        for socket in self.board.get_all_sockets():
-            if socket.state == SocketState.PLAYER2_LAST:
-                self.player2_last_move = socket.position
-            elif socket.state == SocketState.PLAYER1_LAST:
-                self.player1_last_move = socket.position
+    @property
+    def current_player(self) -> PlayerNumber:
+        """The player whose marble the next move places"""
+        return PLAYERS[self.bitboard.player_to_move]
+
+    @property
+    def hash(self) -> int:
+        """The Zobrist hash of the position"""
+        return self.bitboard.hash
+
+    def make_move(self, socket_index: int) -> None:
+        """
+        Place a marble of the current player in the socket with the specified index.
+        """
+        self.board.make_move(socket_index)
+        self.number_of_moves_made += 1
+
+    def unmake_move(self) -> None:
+        """
+        Revert the last move made.
+        """
+        self.board.unmake_move()
+        self.number_of_moves_made -= 1
 
     def place_marble_at_position(self, position: Position) -> bool:
         """
         Place a marble at the specified position.
         """
-        if self.current_player == PlayerNumber.ONE:
-            if self.board.set_p1_marble_at_position(position):
-                self.moves_made.append(position)
-                self.switch_player()
-                return True
-        else:
-            if self.board.set_p2_marble_at_position(position):
-                self.moves_made.append(position)
-                self.switch_player()
-                return True
-
-        return False
+        socket = self.board.get_socket_at_position(position)
+        if socket is None or socket.state != SocketState.EMPTY:
+            return False
 
-    def switch_player(self) -> None:
-        """Switch the current player"""
-        self.current_player = (
-            PlayerNumber.ONE
-            if self.current_player == PlayerNumber.TWO
-            else PlayerNumber.TWO
-        )
+        self.make_move(socket.index)
+        return True
 
     def revert_last_move(self) -> None:
         """
         Revert the last move.
         """
-        if len(self.moves_made) == 0:
+        if self.number_of_moves_made == 0:
             return
 
-        position = self.moves_made.pop()
-        socket = self.board.get_socket_at_position(position)
-        socket.state = SocketState.EMPTY
-
-        if len(self.moves_made) > 1:
-            last_move = self.moves_made[-2]
-        else:
-            if self.current_player == PlayerNumber.ONE:
-                last_move = self.player2_last_move
-            else:
-                last_move = self.player1_last_move
-
-        if last_move is not None:
-            last_socket = self.board.get_socket_at_position(last_move)
-            last_socket.state = (
-                SocketState.PLAYER1_LAST
-                if last_socket.state == SocketState.PLAYER1
-                else SocketState.PLAYER2_LAST
-            )
-
-        self.switch_player()
+        self.unmake_move()
 
     def revert_all_moves(self) -> None:
         """
         Revert all the moves.
         """
-        while len(self.moves_made) > 0:
-            self.revert_last_move()
+        while self.number_of_moves_made > 0:
+            self.unmake_move()
+
+    def get_move_gain(self, socket: Socket) -> int:
+        """
+        Get the change of the evaluation if the current player
+        placed a marble in the specified socket.
+        """
+        return self.bitboard.get_score_change(
+            socket.index, self.bitboard.player_to_move
+        )
+
+    def evaluate_moves(self, moves: list[Socket]) -> list[int]:
+        """
+        Evaluate the board after each of the moves of the current player,
+        all at once and without making them.
+        The evaluations are the ones evaluate would return after making each move.
+        """
+        return self.bitboard.get_move_evaluations([socket.index for socket in moves])
 
     def evaluate(self) -> int:
         """
@@ -484,9 +593,10 @@ class VirtualBoard:
 
         Positive evaluation means player 1 is winning.
         Negative evaluation means player 2 is winning.
+
+        The difference is kept up to date by every move made and taken back.
         """
-        p1_score, p2_score = get_scores(self.board)
-        return p1_score - p2_score
+        return self.bitboard.score_difference
 
     def __enter__(self) -> "VirtualBoard":
         return self
@@ -498,9 +608,13 @@ class VirtualBoard:
         """Get all the possible moves for the current player"""
         return self.board.get_possible_moves(self.current_player)
 
+    def has_any_move(self) -> bool:
+        """Check if the current player has a possible move"""
+        return self.board.has_any_move(self.current_player)
+
     def is_game_over(self) -> bool:
         """Check if the game is over"""
-        return len(self.get_possible_moves()) == 0
+        return not self.has_any_move()
 
 
 # pylint: disable=too-few-public-methods
@@ -510,22 +624,31 @@ class BoardMaker:
     """
 
     @staticmethod
-    def get_standard_board() -> BoardInterface:
+    def get_standard_board(seed: int = None) -> BoardInterface:
         """
         Get a standard board.
+        The same seed always gives the same board, without a seed the board is random.
         """
-        _board = Board(BOARD_AVAILABLE_SIZE)
+        _board = Board(BOARD_AVAILABLE_SIZE, random.Random(seed))
         _board.initialize_standard_board()
 
         iboard = BoardInterface(_board)
         return iboard
 
     @staticmethod
-    def get_very_small_board() -> BoardInterface:
+    def get_pool_board(pool: "BoardPool", index: int) -> BoardInterface:
+        """
+        Get the board with the given index from a pool of pre-generated boards.
+        """
+        return BoardInterface.from_snapshot(pool.get_state(index))
+
+    @staticmethod
+    def get_very_small_board(seed: int = None) -> BoardInterface:
         """
         Get a very small board.
+        The same seed always gives the same board, without a seed the board is random.
         """
-        _board = Board(8)
+        _board = Board(8, random.Random(seed))
         _board.max_board_size = 5
 
         bag_of_qtiles = [QuantumTileMaker.get2x2() for _ in range(4)]
@@ -538,17 +661,7 @@ class BoardMaker:
 
 def get_scores(_board: BoardInterface) -> tuple[int, int]:
     """Calculates the scores of the players"""
-    player1_score = 0
-    player2_score = 0
-
-    for tile in _board.get_all_tiles():
-        owner = tile.get_owner()
-        if owner == TileOwner.PLAYER1:
-            player1_score += tile.get_points()
-        elif owner == TileOwner.PLAYER2:
-            player2_score += tile.get_points()
-
-    return (player1_score, player2_score)
+    return _board.bitboard.get_scores()
 
 
 if __name__ == "__main__":
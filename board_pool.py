@@ -0,0 +1,140 @@
+"""
+This file contains the BoardPool class, which reads pre-generated boards
+from a memory-mapped file, and the functions to write such a file.
+
+The file starts with a header: a magic string, the size of the grid,
+the number of sockets of every board and the number of boards.
+Every board is a fixed-size record with the cell of every socket followed by
+the index of its tile, as in the layout of a GameState.
+Boards are generated by `generate_boards.py`.
+"""
+
+import mmap
+import struct
+from bitboard import NO_SOCKET
+from game_state import GameState
+
+DEFAULT_POOL_PATH = "boards.pool"
+MAGIC = b"KBP1"
+HEADER = struct.Struct("<4sBBHI")
+
+# Every process keeps the pools it opened, by path
+OPEN_POOLS: dict[str, "BoardPool"] = {}
+
+
+class BoardPool:
+    """
+    Memory-mapped file of boards without marbles, read by index.
+    Pools pickle as their path, so worker processes open the file themselves.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+        with open(path, "rb") as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, size, number_of_sockets, _, number_of_boards = HEADER.unpack_from(
+            self.data
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a board pool")
+
+        self.size: int = size
+        self.number_of_sockets: int = number_of_sockets
+        self.number_of_boards: int = number_of_boards
+        self.record_size = 2 * self.number_of_sockets
+
+    def __len__(self) -> int:
+        return self.number_of_boards
+
+    def __reduce__(self) -> tuple:
+        return (open_board_pool, (self.path,))
+
+    def __enter__(self) -> "BoardPool":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmaps the file."""
+        OPEN_POOLS.pop(self.path, None)
+        self.data.close()
+
+    def get_state(self, index: int) -> GameState:
+        """Get the board with the given index, as a snapshot of the board without marbles."""
+        if not 0 <= index < self.number_of_boards:
+            raise IndexError(f"Board {index} is not in a pool of {len(self)} boards")
+
+        start = HEADER.size + index * self.record_size
+        middle = start + self.number_of_sockets
+        return GameState(
+            self.size,
+            tuple(self.data[start:middle]),
+            tuple(self.data[middle : start + self.record_size]),
+            (0, 0),
+            (NO_SOCKET, NO_SOCKET),
+            0,
+        )
+
+
+def open_board_pool(path: str) -> BoardPool:
+    """Get the pool at the given path, opening it if this process has not already."""
+    pool = OPEN_POOLS.get(path)
+    if pool is None:
+        pool = OPEN_POOLS[path] = BoardPool(path)
+    return pool
+
+
+def get_layout_record(state: GameState) -> bytes:
+    """Get the record of a board: the cell of every socket, then the index of its tile."""
+    return bytes(state.cells) + bytes(state.socket_tiles)
+
+
+def get_canonical_layout(state: GameState) -> tuple:
+    """
+    Get a key that is the same for boards with the same tiles,
+    whatever the order of their tiles and sockets, and up to rotations and reflections.
+    """
+    tiles: dict[int, list[tuple[int, int]]] = {}
+    for cell, tile_index in zip(state.cells, state.socket_tiles):
+        tiles.setdefault(tile_index, []).append(divmod(cell, state.size))
+
+    keys = []
+    for transform in (
+        lambda x, y: (x, y),
+        lambda x, y: (-x, y),
+        lambda x, y: (x, -y),
+        lambda x, y: (-x, -y),
+        lambda x, y: (y, x),
+        lambda x, y: (-y, x),
+        lambda x, y: (y, -x),
+        lambda x, y: (-y, -x),
+    ):
+        transformed = [[transform(x, y) for x, y in cells] for cells in tiles.values()]
+        min_x = min(x for cells in transformed for x, _ in cells)
+        min_y = min(y for cells in transformed for _, y in cells)
+        keys.append(
+            tuple(
+                sorted(
+                    tuple(sorted((x - min_x, y - min_y) for x, y in cells))
+                    for cells in transformed
+                )
+            )
+        )
+
+    return min(keys)
+
+
+def write_board_pool(path: str, states: list[GameState]) -> None:
+    """Writes the layouts of the given boards, which must have the same number of sockets."""
+    size = states[0].size if states else 0
+    number_of_sockets = len(states[0].cells) if states else 0
+
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, size, number_of_sockets, 0, len(states)))
+        for state in states:
+            if state.size != size or len(state.cells) != number_of_sockets:
+                raise ValueError("All the boards of a pool must have the same shape")
+            file.write(get_layout_record(state))
@@ -27,3 +27,11 @@ class PlayerNumber(Enum):
 
     ONE = 1
     TWO = 2
+
+
+class Bound(Enum):
+    """Represents how a stored search score relates to the real score."""
+
+    EXACT = 1
+    LOWER = 2
+    UPPER = 3
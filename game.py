@@ -1,12 +1,18 @@
 """The main class for the game"""
 
+from typing import TYPE_CHECKING
 from board import BoardInterface, BoardMaker, get_scores
 from constants import MARBLES_PER_PLAYER
 from data import GameInfo
 from enums import PlayerNumber
-from player import HumanPlayer, MinimaxPlayer, NaivePlayer, Player, RandomPlayer
+from player import Player
 from tile import Socket
 
+# The pool and profiler code is only loaded by the callers that pass them
+if TYPE_CHECKING:
+    from board_pool import BoardPool
+    from profiling import ProfilerHook
+
 # pylint: disable=too-many-instance-attributes
 
 
@@ -27,15 +33,21 @@ class Kulami:
 
         self.possible_moves: list[Socket] = None
 
-    def initialize_standard_board(self) -> None:
-        """Initializes the board with the standard tiles"""
-        self.board = BoardMaker.get_standard_board()
+    def initialize_standard_board(self, seed: int = None) -> None:
+        """Initializes the board with the standard tiles, placed randomly or from the seed"""
+        self.board = BoardMaker.get_standard_board(seed)
+
+        self.possible_moves = self.board.get_possible_moves(PlayerNumber.ONE)
+
+    def initialize_pool_board(self, pool: "BoardPool", index: int) -> None:
+        """Initializes the board with the board at the given index of a board pool"""
+        self.board = BoardMaker.get_pool_board(pool, index)
 
         self.possible_moves = self.board.get_possible_moves(PlayerNumber.ONE)
 
-    def initialize_very_small_board(self) -> None:
-        """Initializes the board with the very small tiles"""
-        self.board = BoardMaker.get_very_small_board()
+    def initialize_very_small_board(self, seed: int = None) -> None:
+        """Initializes the board with the very small tiles, placed randomly or from the seed"""
+        self.board = BoardMaker.get_very_small_board(seed)
 
         self.possible_moves = self.board.get_possible_moves(PlayerNumber.ONE)
 
@@ -86,13 +98,30 @@ class Kulami:
             PlayerNumber.ONE if current_player == PlayerNumber.TWO else PlayerNumber.TWO
         )
 
-    def play(self, verbose=False) -> PlayerNumber:
-        """Starts the game to be played on the terminal"""
+    def play_turns(self, verbose=False, profiler: "ProfilerHook" = None) -> None:
+        """Plays the turns until the game is over"""
         while self.turn < self.max_turns and self.possible_moves:
             if verbose:
                 print("Turn " + str(self.turn + 1))
                 self.board.draw()
-            self.player_turn()
+            if profiler is not None:
+                with profiler.profile_turn(self):
+                    self.player_turn()
+            else:
+                self.player_turn()
+
+    def play(self, verbose=False, profiler: "ProfilerHook" = None) -> PlayerNumber:
+        """
+        Starts the game to be played on the terminal.
+        The profiler hook, if given, profiles the game or the turns it selects.
+        """
+        if profiler is not None:
+            with profiler.profile_game(self):
+                self.play_turns(verbose, profiler)
+        else:
+            self.play_turns(verbose)
+        self.player1.end_game()
+        self.player2.end_game()
 
         player1_score, player2_score = get_scores(self.board)
         if verbose:
@@ -110,6 +139,10 @@ class Kulami:
 
 
 if __name__ == "__main__":
+    # Only the terminal game needs the concrete players
+    # pylint: disable=ungrouped-imports
+    from player import HumanPlayer, MinimaxPlayer, NaivePlayer, RandomPlayer
+
     human1 = HumanPlayer()
     human2 = HumanPlayer()
 
@@ -0,0 +1,98 @@
+"""
+This file contains the GameState class, an immutable snapshot of a board
+that can be hashed, pickled and sent to other processes.
+"""
+
+from dataclasses import dataclass
+from bitboard import NO_SOCKET
+
+# Marks a missing last marble in the bytes encoding
+NO_SOCKET_BYTE = 255
+
+
+@dataclass(frozen=True, slots=True)
+class GameState:
+    """
+    Immutable snapshot of the layout and the marbles of a board.
+
+    The static layout lists, for every socket in the order of the board's list of sockets,
+    its cell (x * size + y) and the index of its tile.
+    The dynamic state holds the marbles of each player as bitmasks over the sockets,
+    the socket index of each player's last marble and the player to move (0 or 1).
+
+    Snapshots compare and hash by value, so they can be used as dict keys.
+    They pickle through their bytes encoding, which takes a few hundred bytes.
+    """
+
+    size: int
+    cells: tuple[int, ...]
+    socket_tiles: tuple[int, ...]
+    player_masks: tuple[int, int]
+    last_marbles: tuple[int, int]
+    player_to_move: int
+
+    def __repr__(self) -> str:
+        return (
+            f"GameState({len(self.cells)} sockets, "
+            f"{self.get_turn()} marbles, player {self.player_to_move + 1} to move)"
+        )
+
+    def __reduce__(self) -> tuple:
+        return (GameState.from_bytes, (self.to_bytes(),))
+
+    def get_turn(self) -> int:
+        """Get the number of marbles on the board."""
+        return self.player_masks[0].bit_count() + self.player_masks[1].bit_count()
+
+    def to_bytes(self) -> bytes:
+        """
+        Encode the snapshot as bytes:
+        size, number of sockets and player to move,
+        one byte per socket for its cell and one for its tile,
+        the two marble masks and the two last marbles.
+        """
+        number_of_sockets = len(self.cells)
+        mask_length = (number_of_sockets + 7) // 8
+
+        encoded = bytearray((self.size, number_of_sockets, self.player_to_move))
+        encoded += bytes(self.cells)
+        encoded += bytes(self.socket_tiles)
+        for mask in self.player_masks:
+            encoded += mask.to_bytes(mask_length, "little")
+        for last_marble in self.last_marbles:
+            encoded.append(NO_SOCKET_BYTE if last_marble == NO_SOCKET else last_marble)
+
+        return bytes(encoded)
+
+    @staticmethod
+    def from_bytes(encoded: bytes) -> "GameState":
+        """Decode a snapshot encoded with to_bytes."""
+        size, number_of_sockets, player_to_move = encoded[0], encoded[1], encoded[2]
+        mask_length = (number_of_sockets + 7) // 8
+
+        offset = 3
+        cells = tuple(encoded[offset : offset + number_of_sockets])
+        offset += number_of_sockets
+        socket_tiles = tuple(encoded[offset : offset + number_of_sockets])
+        offset += number_of_sockets
+
+        player_masks = []
+        for _ in range(2):
+            player_masks.append(
+                int.from_bytes(encoded[offset : offset + mask_length], "little")
+            )
+            offset += mask_length
+
+        last_marbles = tuple(
+            NO_SOCKET if byte == NO_SOCKET_BYTE else byte
+            for byte in encoded[offset : offset + 2]
+        )
+
+        return GameState(
+            size,
+            cells,
+            socket_tiles,
+            tuple(player_masks),
+            last_marbles,
+            player_to_move,
+        )
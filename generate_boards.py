@@ -0,0 +1,95 @@
+"""
+Generates distinct standard boards on several processes and writes them to a board pool,
+which `BoardMaker.get_pool_board` reads by index.
+
+Board i of the pool is the i-th distinct board generated from the seeds seed, seed + 1, ...,
+so the same arguments always write the same pool.
+
+Usage: `python generate_boards.py number_of_boards [--output PATH] [--seed SEED] [--workers N]`
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
+from board import Board, BoardMaker
+from board_pool import DEFAULT_POOL_PATH, get_canonical_layout, write_board_pool
+from game_state import GameState
+
+TASKS_PER_WORKER = 4
+
+
+@cache
+def get_standard_number_of_sockets() -> int:
+    """Get the number of sockets of a board with all the standard tiles."""
+    return sum(len(qtile.raw_positions) for qtile in Board.get_standard_bag_of_qtiles())
+
+
+def generate_layout(seed: int) -> GameState | None:
+    """
+    Generates a standard board from the seed.
+    Returns its snapshot, or None if not all the tiles could be placed.
+    """
+    iboard = BoardMaker.get_standard_board(seed)
+
+    if len(iboard.get_all_sockets()) != get_standard_number_of_sockets():
+        return None
+    return iboard.snapshot()
+
+
+def generate_board_pool(
+    path: str, number_of_boards: int, seed: int = 0, workers: int = 1
+) -> int:
+    """
+    Generates the given number of distinct standard boards and writes them to a pool.
+    Boards equal up to rotations and reflections are kept once.
+    Returns the number of duplicate boards left out.
+    """
+    states: list[GameState] = []
+    seen_layouts = set()
+    duplicates = 0
+    next_seed = seed
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while len(states) < number_of_boards:
+            seeds = range(next_seed, next_seed + number_of_boards - len(states))
+            next_seed = seeds.stop
+
+            chunksize = max(1, len(seeds) // (workers * TASKS_PER_WORKER))
+            for state in pool.map(generate_layout, seeds, chunksize=chunksize):
+                if state is None:
+                    continue
+
+                layout = get_canonical_layout(state)
+                if layout in seen_layouts:
+                    duplicates += 1
+                    continue
+                seen_layouts.add(layout)
+
+                if len(states) < number_of_boards:
+                    states.append(state)
+
+    write_board_pool(path, states)
+    return duplicates
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a pool of standard boards")
+    parser.add_argument("number_of_boards", type=int)
+    parser.add_argument("--output", default=DEFAULT_POOL_PATH)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    arguments = parser.parse_args()
+
+    start_time = time.perf_counter()
+    DUPLICATES = generate_board_pool(
+        arguments.output, arguments.number_of_boards, arguments.seed, arguments.workers
+    )
+    elapsed = time.perf_counter() - start_time
+
+    print(
+        f"Wrote {arguments.number_of_boards} boards to {arguments.output} "
+        f"in {elapsed:.1f} s ({arguments.number_of_boards / elapsed:.0f} boards per second), "
+        f"{DUPLICATES} duplicates left out"
+    )
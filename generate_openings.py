@@ -0,0 +1,120 @@
+"""
+Computes the best first moves and the best replies to every first move of boards
+on several processes and adds them to an opening book, which MinimaxPlayer plays from.
+
+The boards are the first boards of a board pool written by `generate_boards.py`,
+or the standard boards of the seeds start, start + 1, ... if there is no pool.
+Moves already in the book are not computed again, so the book can be extended
+by running the script again on more boards or stopped and resumed.
+
+Usage: `python generate_openings.py number_of_boards [--start INDEX] [--depth DEPTH]
+[--pool PATH] [--output PATH] [--workers N]`
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from board import BoardInterface, BoardMaker
+from board_pool import DEFAULT_POOL_PATH, open_board_pool
+from data import GameInfo
+from enums import PlayerNumber
+from game_state import GameState
+from opening_book import DEFAULT_BOOK_PATH, OpeningBook
+from player import MinimaxPlayer
+
+# The book is written to disk every time this number of moves has been computed
+SAVE_INTERVAL = 256
+
+
+def compute_opening_move(
+    state: GameState, prefix: tuple[int, ...], depth: int
+) -> tuple[int, tuple[int, ...], int]:
+    """
+    Searches the best move after the moves of the prefix on the board of the snapshot.
+    Returns the layout key of the board, the prefix and the socket index of the move.
+    """
+    iboard = BoardInterface.from_snapshot(state)
+    for socket_index in prefix:
+        iboard.make_move(socket_index)
+
+    current_player = PlayerNumber(iboard.bitboard.player_to_move + 1)
+    possible_moves = iboard.get_possible_moves(current_player)
+    game_info = GameInfo(current_player, possible_moves, iboard, len(prefix))
+
+    position = MinimaxPlayer(depth).search_move(game_info)
+    move = iboard.get_socket_at_position(position)
+    return iboard.bitboard.layout_key, prefix, move.index
+
+
+def get_opening_tasks(
+    state: GameState, book: OpeningBook
+) -> list[tuple[GameState, tuple[int, ...]]]:
+    """Get the positions of the board whose moves are not in the book yet."""
+    iboard = BoardInterface.from_snapshot(state)
+    layout_key = iboard.bitboard.layout_key
+
+    prefixes = [()]
+    for socket in iboard.get_possible_moves(PlayerNumber.ONE):
+        # Some first moves leave no reply, the game is over after them
+        iboard.make_move(socket.index)
+        if iboard.get_possible_moves(PlayerNumber.TWO):
+            prefixes.append((socket.index,))
+        iboard.unmake_move()
+
+    return [
+        (state, prefix) for prefix in prefixes if not book.has_move(layout_key, prefix)
+    ]
+
+
+def build_opening_book(
+    book: OpeningBook, states: list[GameState], depth: int, workers: int = 1
+) -> int:
+    """
+    Adds the moves of the boards of the snapshots to the book and saves it.
+    Returns the number of moves computed.
+    """
+    tasks = [task for state in states for task in get_opening_tasks(state, book)]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(compute_opening_move, state, prefix, depth)
+            for state, prefix in tasks
+        ]
+        for number_computed, future in enumerate(as_completed(futures), 1):
+            book.add_move(*future.result())
+            if number_computed % SAVE_INTERVAL == 0:
+                book.save()
+
+    book.save()
+    return len(tasks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute an opening book")
+    parser.add_argument("number_of_boards", type=int)
+    parser.add_argument("--start", type=int, default=0)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--pool", default=DEFAULT_POOL_PATH)
+    parser.add_argument("--output", default=DEFAULT_BOOK_PATH)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    arguments = parser.parse_args()
+
+    indices = range(arguments.start, arguments.start + arguments.number_of_boards)
+    if os.path.exists(arguments.pool):
+        BOARD_POOL = open_board_pool(arguments.pool)
+        STATES = [BOARD_POOL.get_state(i % len(BOARD_POOL)) for i in indices]
+    else:
+        STATES = [BoardMaker.get_standard_board(i).snapshot() for i in indices]
+
+    start_time = time.perf_counter()
+    NUMBER_COMPUTED = build_opening_book(
+        OpeningBook(arguments.output), STATES, arguments.depth, arguments.workers
+    )
+    elapsed = time.perf_counter() - start_time
+
+    print(
+        f"Computed {NUMBER_COMPUTED} moves of {arguments.number_of_boards} boards "
+        f"at depth {arguments.depth} in {elapsed:.1f} s, "
+        f"written to {arguments.output}"
+    )
@@ -4,46 +4,96 @@ It is used to play a given number of matches between two players and save the re
 """
 
 import datetime
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from board_pool import DEFAULT_POOL_PATH, BoardPool, open_board_pool
+from opening_book import DEFAULT_BOOK_PATH, open_opening_book
 from enums import PlayerNumber
 from game import Kulami
 
 # pylint: disable=unused-import
-from player import Player, RandomPlayer, MinimaxPlayer, NaivePlayer
+from player import Player, RandomPlayer, MinimaxPlayer, NaivePlayer, MCTSPlayer
+from profiling import CProfileHook, ProfilerHook, TracemallocHook
+from search_cache import DEFAULT_CACHE_PATH, open_search_cache
+from search_stats import SearchStats
 
 # pylint: enable=unused-import
+# pylint: disable=too-many-instance-attributes
 
 
 class MatchMaker:
-    """Plays a given number of matches between two players and saves the results"""
+    """
+    Plays a given number of matches between two players and saves the results.
+    Match i is played on a board generated from seed + i,
+    so every match can be replayed on its own.
+    With a board pool, match i is played on board (seed + i) % len(board_pool) of the pool,
+    so a seed of 0 plays the first boards of the pool in order.
+    The search statistics of the players that collect them are added up over all the matches.
+    The profiler hook, if given, profiles the games or the turns it selects.
+    """
 
+    # pylint: disable=too-many-arguments
     def __init__(
-        self, player1: Player, player2: Player, number_of_matches: int
+        self,
+        player1: Player,
+        player2: Player,
+        number_of_matches: int,
+        seed: int = None,
+        board_pool: BoardPool = None,
+        profiler: ProfilerHook = None,
     ) -> None:
         self.player1 = player1
         self.player2 = player2
         self.number_of_matches = number_of_matches
 
+        self.seed = seed if seed is not None else random.randrange(10**12)
+        self.board_pool = board_pool
+        self.profiler = profiler
+
         self.player1_wins = 0
         self.player2_wins = 0
+        self.matches_played = 0
+
+        self.player1_stats: SearchStats = (
+            SearchStats() if player1.collect_stats else None
+        )
+        self.player2_stats: SearchStats = (
+            SearchStats() if player2.collect_stats else None
+        )
+
+        self.games_per_second = 0.0
 
-    def play_matches(self) -> None:
-        """Plays the given number of matches"""
-        print("Playing matches between", self.player1, "and", self.player2)
+    def get_match_seeds(self) -> list[int]:
+        """Get the seed of every match"""
+        return [self.seed + i for i in range(self.number_of_matches)]
 
-        for _ in range(self.number_of_matches):
-            game = Kulami(self.player1, self.player2)
-            game.initialize_standard_board()
-            winner = game.play()
+    def add_result(
+        self,
+        winner: PlayerNumber,
+        player1_stats: SearchStats = None,
+        player2_stats: SearchStats = None,
+    ) -> None:
+        """Adds the result of a match, and the search statistics of the players in it"""
+        self.matches_played += 1
+        if winner == PlayerNumber.ONE:
+            self.player1_wins += 1
+        elif winner == PlayerNumber.TWO:
+            self.player2_wins += 1
 
-            if winner == PlayerNumber.ONE:
-                self.player1_wins += 1
-            elif winner == PlayerNumber.TWO:
-                self.player2_wins += 1
+        if self.player1_stats is not None and player1_stats is not None:
+            self.player1_stats.add(player1_stats)
+        if self.player2_stats is not None and player2_stats is not None:
+            self.player2_stats.add(player2_stats)
 
-        self.save_results()
+    def play_matches(self, workers: int = 1) -> None:
+        """Plays the given number of matches, on the given number of processes"""
+        play_all_matches([self], workers)
 
     def save_results(self) -> None:
         """Saves the results of the matches"""
+        os.makedirs("results", exist_ok=True)
         with open(
             f"results/{self.player1}_vs_{self.player2}_{self.number_of_matches}.txt",
             "w",
@@ -52,10 +102,139 @@ class MatchMaker:
             file.write(f"{self.player1} wins: {self.player1_wins}\n")
             file.write(f"{self.player2} wins: {self.player2_wins}\n")
             file.write(f"Total matches: {self.number_of_matches}\n")
+            file.write(f"Seed: {self.seed}\n")
+            if self.board_pool is not None:
+                file.write(f"Board pool: {self.board_pool.path}\n")
+            file.write(f"Games per second: {self.games_per_second:.3f}\n")
+            if self.player1_stats is not None:
+                file.write(f"{self.player1} search: {self.player1_stats}\n")
+            if self.player2_stats is not None:
+                file.write(f"{self.player2} search: {self.player2_stats}\n")
+
+
+def play_match(
+    player1: Player,
+    player2: Player,
+    seed: int,
+    board_pool: BoardPool = None,
+    profiler: ProfilerHook = None,
+) -> PlayerNumber:
+    """
+    Plays a single match on a standard board generated from the seed,
+    or on the board of the pool selected by the seed.
+    The random choices of the players are seeded from it as well.
+    """
+    player_seeds = random.Random(seed)
+    player1.set_seed(player_seeds.getrandbits(64))
+    player2.set_seed(player_seeds.getrandbits(64))
+
+    game = Kulami(player1, player2)
+    if board_pool is not None:
+        game.initialize_pool_board(board_pool, seed % len(board_pool))
+    else:
+        game.initialize_standard_board(seed)
+    return game.play(profiler=profiler)
+
+
+def play_match_with_stats(
+    player1: Player,
+    player2: Player,
+    seed: int,
+    board_pool: BoardPool = None,
+    profiler: ProfilerHook = None,
+) -> tuple[PlayerNumber, SearchStats | None, SearchStats | None]:
+    """
+    Plays a single match like play_match and returns the winner
+    with the search statistics of each player in the match, or None if it does not collect them.
+    """
+    player1.reset_stats()
+    player2.reset_stats()
+    winner = play_match(player1, player2, seed, board_pool, profiler)
+    return winner, player1.total_stats, player2.total_stats
+
+
+def play_all_matches(match_makers: list[MatchMaker], workers: int = 1) -> None:
+    """
+    Plays the matches of all the match makers, on a pool of worker processes
+    if there is more than one worker. Results are added as the games complete,
+    and the results of a match maker are saved once all its games are played.
+    """
+    start_time = time.perf_counter()
+    games_played = 0
+
+    for match_maker in match_makers:
+        print(
+            "Playing matches between", match_maker.player1, "and", match_maker.player2
+        )
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(
+                    play_match_with_stats,
+                    match_maker.player1,
+                    match_maker.player2,
+                    seed,
+                    match_maker.board_pool,
+                    match_maker.profiler,
+                ): match_maker
+                for match_maker in match_makers
+                for seed in match_maker.get_match_seeds()
+            }
+            for future in as_completed(futures):
+                games_played += 1
+                record_result(futures[future], future.result(), start_time)
+    else:
+        for match_maker in match_makers:
+            for seed in match_maker.get_match_seeds():
+                games_played += 1
+                result = play_match_with_stats(
+                    match_maker.player1,
+                    match_maker.player2,
+                    seed,
+                    match_maker.board_pool,
+                    match_maker.profiler,
+                )
+                record_result(match_maker, result, start_time)
+
+    elapsed = time.perf_counter() - start_time
+    print(
+        f"Played {games_played} games in {elapsed:.1f} s "
+        f"({games_played / elapsed:.2f} games per second)"
+    )
+
+
+def record_result(match_maker: MatchMaker, result: tuple, start_time: float) -> None:
+    """
+    Adds the result of a game, returned by play_match_with_stats,
+    and saves the results once all the games are played
+    """
+    match_maker.add_result(*result)
+
+    if match_maker.matches_played == match_maker.number_of_matches:
+        elapsed = time.perf_counter() - start_time
+        match_maker.games_per_second = match_maker.number_of_matches / elapsed
+        print(
+            f"{match_maker.player1} vs {match_maker.player2}: "
+            f"{match_maker.player1_wins} - {match_maker.player2_wins}"
+        )
+        match_maker.save_results()
 
 
 if __name__ == "__main__":
     N = 10
+    WORKERS = os.cpu_count()
+
+    # Add opening_book=OPENING_BOOK to a MinimaxPlayer below to play its first moves
+    # from the book written by generate_openings.py
+    OPENING_BOOK = None
+    if os.path.exists(DEFAULT_BOOK_PATH):
+        OPENING_BOOK = open_opening_book(DEFAULT_BOOK_PATH)
+
+    # To reuse the searches of the previous runs on the same boards, use
+    # open_search_cache(DEFAULT_CACHE_PATH) and add search_cache=SEARCH_CACHE
+    # to a MinimaxPlayer below
+    SEARCH_CACHE = None
 
     matches = [
         # (RandomPlayer(), RandomPlayer()),
@@ -94,22 +273,32 @@ if __name__ == "__main__":
         # (MinimaxPlayer(3), MinimaxPlayer(1)),
         # (MinimaxPlayer(3), MinimaxPlayer(2)),
         # (MinimaxPlayer(3), MinimaxPlayer(3)),
+        # (MCTSPlayer(time_ms=100), MinimaxPlayer(time_ms=100)),
     ]
 
     total_start_time = datetime.datetime.now()
 
-    for match in matches:
-        match_start_time = datetime.datetime.now()
-
-        match_maker = MatchMaker(match[0], match[1], N)
-        match_maker.play_matches()
-        match_time = datetime.datetime.now() - match_start_time
-        total_time = datetime.datetime.now() - total_start_time
-
-        match_time = datetime.datetime.utcfromtimestamp(
-            match_time.total_seconds()
-        ).strftime("%H:%M:%S.%f")
-        total_time = datetime.datetime.utcfromtimestamp(
-            total_time.total_seconds()
-        ).strftime("%H:%M:%S.%f")
-        print(f"Time elapsed: {match_time} / {total_time}")
+    # Every match maker plays the first boards of the pool written by generate_boards.py,
+    # or generates its boards if there is no pool
+    BOARD_POOL = None
+    if os.path.exists(DEFAULT_POOL_PATH):
+        BOARD_POOL = open_board_pool(DEFAULT_POOL_PATH)
+
+    # To profile one in 10 of the mid-game turns of the MinimaxPlayer side, use
+    # CProfileHook(player="MinimaxPlayer", turns=range(10, 40), every=10),
+    # or TracemallocHook with the same arguments to trace their memory
+    PROFILER = None
+
+    all_match_makers = [
+        MatchMaker(
+            match[0], match[1], N, 0 if BOARD_POOL else None, BOARD_POOL, PROFILER
+        )
+        for match in matches
+    ]
+    play_all_matches(all_match_makers, WORKERS)
+
+    total_time = datetime.datetime.now() - total_start_time
+    total_time = datetime.datetime.utcfromtimestamp(
+        total_time.total_seconds()
+    ).strftime("%H:%M:%S.%f")
+    print(f"Time elapsed: {total_time}")
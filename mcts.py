@@ -0,0 +1,57 @@
+"""
+This file contains the MCTSNode class,
+which represents a position of the search tree of MCTSPlayer.
+"""
+
+import math
+from dataclasses import dataclass, field
+
+
+# pylint: disable=too-many-instance-attributes
+@dataclass(slots=True, eq=False)
+class MCTSNode:
+    """
+    A position of the Monte Carlo search tree, reached by playing move from the parent position.
+    The wins are counted for the player who played the move (0 for player 1, 1 for player 2),
+    so the parent chooses between its children from that player's point of view.
+    """
+
+    move: int
+    parent: "MCTSNode | None"
+    player_index: int
+    hash: int
+    untried_moves: list[int]
+    children: dict[int, "MCTSNode"] = field(default_factory=dict)
+    visits: int = 0
+    wins: float = 0.0
+
+    def select_child(self, exploration: float) -> "MCTSNode":
+        """Get the child with the highest upper confidence bound (UCT)."""
+        log_visits = math.log(self.visits)
+        return max(
+            self.children.values(),
+            key=lambda child: child.wins / child.visits
+            + exploration * math.sqrt(log_visits / child.visits),
+        )
+
+    def add_child(
+        self, move: int, position_hash: int, untried_moves: list[int]
+    ) -> "MCTSNode":
+        """Adds the node of the position reached by playing the move from this one."""
+        child = MCTSNode(
+            move, self, 1 - self.player_index, position_hash, untried_moves
+        )
+        self.children[move] = child
+        return child
+
+    def update(self, winner: int | None) -> None:
+        """Counts a playout won by the player with the given index, or drawn if None."""
+        self.visits += 1
+        if winner is None:
+            self.wins += 0.5
+        elif winner == self.player_index:
+            self.wins += 1
+
+    def get_most_visited_child(self) -> "MCTSNode | None":
+        """Get the child visited the most, which is the move to play."""
+        return max(self.children.values(), key=lambda child: child.visits, default=None)
@@ -0,0 +1,101 @@
+"""
+This file contains the OpeningBook class, which stores the best first and second moves
+of boards by the hash of their layout, so players do not have to search them.
+
+Books are computed by `generate_openings.py` and stored as JSON:
+for every board, the hexadecimal layout key of its BitBoard maps the move prefix
+(the socket indices of the moves already played, separated by commas)
+to the socket index of the move.
+"""
+
+import json
+import os
+from bitboard import BitBoard
+
+DEFAULT_BOOK_PATH = "openings.book"
+
+# Number of moves of a game covered by the book: the first move and the reply to it
+BOOK_PLIES = 2
+
+# Every process keeps the books it opened, by path
+OPEN_BOOKS: dict[str, "OpeningBook"] = {}
+
+
+def get_opening_prefix(bitboard: BitBoard) -> tuple[int, ...] | None:
+    """
+    Get the socket indices of the moves played on the board, in order,
+    or None if more moves than the book covers were played.
+    """
+    player1_marbles, player2_marbles = bitboard.player_masks
+    if player1_marbles.bit_count() + player2_marbles.bit_count() >= BOOK_PLIES:
+        return None
+    if player1_marbles:
+        return (bitboard.last_marbles[0],)
+    return ()
+
+
+class OpeningBook:
+    """
+    The moves of the book, by layout key and move prefix.
+    A book with a path pickles as its path, so worker processes open the file themselves.
+    """
+
+    def __init__(self, path: str = None) -> None:
+        self.path = path
+        self.moves: dict[int, dict[tuple[int, ...], int]] = {}
+
+        if path is not None and os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                for layout_key, moves in json.load(file).items():
+                    self.moves[int(layout_key, 16)] = {
+                        tuple(int(move) for move in prefix.split(",") if move): move
+                        for prefix, move in moves.items()
+                    }
+
+    def __len__(self) -> int:
+        return len(self.moves)
+
+    def __reduce__(self) -> tuple:
+        if self.path is None:
+            return (OpeningBook, (), {"moves": self.moves})
+        return (open_opening_book, (self.path,))
+
+    def get_move(self, bitboard: BitBoard) -> int | None:
+        """Get the socket index of the book move in the position of the board, or None."""
+        prefix = get_opening_prefix(bitboard)
+        if prefix is None:
+            return None
+        return self.moves.get(bitboard.layout_key, {}).get(prefix)
+
+    def add_move(self, layout_key: int, prefix: tuple[int, ...], move: int) -> None:
+        """Adds the move to play after the moves of the prefix on the board with the layout key."""
+        self.moves.setdefault(layout_key, {})[prefix] = move
+
+    def has_move(self, layout_key: int, prefix: tuple[int, ...]) -> bool:
+        """Check if the book has the move after the prefix on the board with the layout key."""
+        return prefix in self.moves.get(layout_key, {})
+
+    def save(self, path: str = None) -> None:
+        """Writes the book to the path, or to the path it was opened from."""
+        path = path if path is not None else self.path
+        encoded = {
+            f"{layout_key:016x}": {
+                ",".join(str(move) for move in prefix): move
+                for prefix, move in moves.items()
+            }
+            for layout_key, moves in self.moves.items()
+        }
+
+        # The book is replaced at once, so players never read a partly written file
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(encoded, file)
+        os.replace(temporary_path, path)
+
+
+def open_opening_book(path: str) -> OpeningBook:
+    """Get the book at the given path, reading it if this process has not already."""
+    book = OPEN_BOOKS.get(path)
+    if book is None:
+        book = OPEN_BOOKS[path] = OpeningBook(path)
+    return book
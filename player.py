@@ -1,81 +1,304 @@
 """This module contains the player classes for the Kulami game."""
 
-from random import choice
-from board import VirtualBoard
+import concurrent.futures
+import functools
+import random
+import time
+from typing import TYPE_CHECKING
+from bitboard import NO_SOCKET, iterate_bits
+from board import PLAYERS, BoardInterface, VirtualBoard
+from constants import MARBLES_PER_PLAYER
 from data import GameInfo
-from enums import PlayerNumber
+from enums import Bound, PlayerNumber
+from game_state import GameState
+from mcts import MCTSNode
 from position import Position
+from search_stats import MeasuredVirtualBoard, SearchStats
 from tile import Socket
+from transposition import TranspositionTable
 
-# pylint: disable=too-few-public-methods
+# The opening book and the search cache, with json and sqlite3,
+# are only loaded by the callers that open them
+if TYPE_CHECKING:
+    from opening_book import OpeningBook
+    from search_cache import SearchCache
+
+# pylint: disable=too-few-public-methods, too-many-lines
+
+INFINITY = 1000
+
+# Number of nodes searched between two checks of the clock
+TIME_CHECK_INTERVAL = 256
+
+# Number of tasks each worker process gets in a root-split search
+TASKS_PER_WORKER = 4
+
+# Number of random paths to the end of the game that estimate the size of the endgame tree
+ENDGAME_PROBES = 8
+
+# The table of solved endgame positions is emptied when it grows beyond this number of entries
+MAX_ENDGAME_ENTRIES = 1 << 20
+
+
+class SearchTimeout(Exception):
+    """Raised when a time-budgeted search runs out of time."""
 
 
 class Player:
-    """A mother class for players"""
+    """
+    A mother class for players.
+    The random choices of a player come from its own random.Random,
+    which play_match reseeds before every match.
+
+    Search players with collect_stats measure their searches:
+    last_stats describes the last move and total_stats all the moves since reset_stats.
+    Without it, both stay None.
+    """
+
+    def __init__(self, seed: int = None, collect_stats: bool = False) -> None:
+        self.rng = random.Random(seed)
+
+        self.collect_stats = collect_stats
+        self.last_stats: SearchStats = None
+        self.total_stats: SearchStats = SearchStats() if collect_stats else None
+
+    def reset_stats(self) -> None:
+        """Forgets the statistics of the previous moves"""
+        self.last_stats = None
+        if self.collect_stats:
+            self.total_stats = SearchStats()
+
+    def set_seed(self, seed: int) -> None:
+        """Reseeds the random choices of the player"""
+        self.rng.seed(seed)
 
     def get_next_move(self, game_info: GameInfo) -> Position:
         """Gets the position the player wants to place their marble in"""
         raise NotImplementedError("get_next_move not implemented")
 
+    def end_game(self) -> None:
+        """Called when a game the player played is over"""
+
     def __str__(self) -> str:
         return self.__class__.__name__
 
 
-class NaivePlayer(Player):
-    """A player that chooses the move with the highest immediate score"""
+class SearchPlayer(Player):
+    """
+    A mother class for the players that search the moves on a VirtualBoard.
+    With collect_stats, every move is searched on a MeasuredVirtualBoard
+    and its statistics are kept, otherwise the search is not measured at all.
+    """
 
     def get_next_move(self, game_info: GameInfo) -> Position | None:
+        if not self.collect_stats:
+            return self.choose_move(game_info)
+
+        stats = self.last_stats = SearchStats(moves=1)
+        start_time = time.perf_counter()
+        self.begin_stats(stats)
+        move = self.choose_move(game_info)
+        self.end_stats(stats)
+        stats.total_seconds = time.perf_counter() - start_time
+
+        self.total_stats.add(stats)
+        return move
+
+    def choose_move(self, game_info: GameInfo) -> Position | None:
+        """Searches the position the player wants to place their marble in"""
+        raise NotImplementedError("choose_move not implemented")
+
+    def get_virtual_board(self, game_info: GameInfo) -> VirtualBoard:
+        """Get a VirtualBoard to search the moves on, measured if statistics are collected"""
+        if self.collect_stats:
+            return MeasuredVirtualBoard(
+                game_info.board, game_info.current_player, self.last_stats
+            )
+        return VirtualBoard(game_info.board, game_info.current_player)
+
+    def begin_stats(self, stats: SearchStats) -> None:
+        """Records the counters of the player before a measured search"""
+
+    def end_stats(self, stats: SearchStats) -> None:
+        """Adds the counters of the player to the statistics of a measured search"""
+        stats.nodes = sum(stats.nodes_per_ply)
+
+
+class NaivePlayer(SearchPlayer):
+    """A player that chooses the move with the highest immediate score"""
+
+    def choose_move(self, game_info: GameInfo) -> Position | None:
         best_move = None
 
         best_score = -1000
 
-        with VirtualBoard(game_info.board, game_info.current_player) as vboard:
-            for socket in game_info.possible_moves:
-                vboard.place_marble_at_position(socket.position)
+        with self.get_virtual_board(game_info) as vboard:
+            scores = vboard.evaluate_moves(game_info.possible_moves)
 
-                score = vboard.evaluate()
-                vboard.revert_last_move()
+        for socket, score in zip(game_info.possible_moves, scores):
+            if game_info.current_player == PlayerNumber.TWO:
+                score *= -1
 
-                if vboard.current_player == PlayerNumber.TWO:
-                    score *= -1
-
-                if score > best_score:
-                    best_score = score
-                    best_move = socket.position
+            if score > best_score:
+                best_score = score
+                best_move = socket.position
 
         return best_move
 
 
-class MinimaxPlayer(Player):
-    """A player that chooses the best move using minimax"""
+class MinimaxPlayer(SearchPlayer):
+    """
+    A player that chooses the best move using minimax.
+    With alpha_beta, the search prunes branches that cannot change the result
+    and tries the moves with the highest immediate score gain first.
+    Both searches choose the same move at the same depth.
+
+    The alpha-beta search remembers searched positions in a transposition table
+    of at most tt_size_mb megabytes. A size of 0 disables it.
+
+    With time_ms, the depth is not fixed: the alpha-beta search is repeated
+    one ply deeper each time, starting with the previous best move,
+    and the move of the deepest search completed within time_ms milliseconds is played.
+
+    With more than one worker, the fixed-depth search splits the root moves
+    across a pool of worker processes. It chooses the same move as the serial search.
+
+    With endgame_nodes, once the game tree left to the end of the game
+    is estimated to have at most that many nodes, the game is solved instead:
+    the search goes to the end of the game, cuts off the positions whose score bounds
+    are outside the window and remembers the exact scores of the positions it solves.
+
+    With an opening_book, the first and second moves of the boards in the book
+    are played from it instead of at random.
+
+    With a search_cache, the alpha-beta search also looks up the positions searched
+    in the previous games on the same board, which the cache keeps on disk,
+    and the positions searched in this game are added to it when the game is over.
+    """
+
+    # pylint: disable=too-many-instance-attributes, too-many-arguments
+    def __init__(
+        self,
+        depth: int = 3,
+        alpha_beta: bool = True,
+        tt_size_mb: float = 16,
+        time_ms: float = None,
+        workers: int = 1,
+        seed: int = None,
+        collect_stats: bool = False,
+        endgame_nodes: int = 0,
+        opening_book: "OpeningBook" = None,
+        search_cache: "SearchCache" = None,
+    ):
+        super().__init__(seed, collect_stats)
 
-    def __init__(self, depth: int = 3):
         self.depth = depth
+        self.alpha_beta = alpha_beta
+        self.tt_size_mb = tt_size_mb
+        self.time_ms = time_ms
+        self.workers = workers
+
+        # Created by the first parallel search,
+        # concurrent.futures only loads the process pool code at that point
+        self.pool: "concurrent.futures.ProcessPoolExecutor" = None
+
+        self.transposition_table: TranspositionTable = None
+        if (alpha_beta or time_ms is not None) and tt_size_mb > 0:
+            self.transposition_table = TranspositionTable(tt_size_mb)
+
+        self.deadline: float = None
+        # The clock is checked once nodes_searched reaches this number,
+        # which the batches of frontier nodes can step over
+        self.next_time_check = TIME_CHECK_INTERVAL
+
+        self.endgame_nodes = endgame_nodes
+        # Exact scores, or bounds on them, of the endgame positions solved, by their hash
+        self.endgame_table: dict[int, tuple[Bound, int]] = {}
+        self.solved_endgame = False
+
+        self.opening_book = opening_book
+        self.search_cache = search_cache
+
+        self.nodes_searched = 0
+        self.cutoffs = 0
+        self.depth_reached = 0
+        # Number of searches from the root in the last iterative deepening
+        self.root_searches = 0
+
+    def __getstate__(self) -> dict:
+        # The pool of worker processes cannot be pickled
+        state = self.__dict__.copy()
+        state["pool"] = None
+        state["endgame_table"] = {}
+        return state
 
     def __str__(self) -> str:
+        if self.time_ms is not None:
+            return self.__class__.__name__ + f"({self.time_ms}ms)"
         return self.__class__.__name__ + f"({self.depth})"
 
-    def get_next_move(self, game_info: GameInfo) -> Position | None:
-        # If it's the first or second turn, choose a random move
+    def choose_move(self, game_info: GameInfo) -> Position | None:
+        self.nodes_searched = 0
+        self.cutoffs = 0
+        self.next_time_check = TIME_CHECK_INTERVAL
+
+        if self.search_cache is not None:
+            self.search_cache.load(game_info.board.bitboard.layout_key)
+
+        self.solved_endgame = (
+            self.endgame_nodes > 0
+            and self._estimate_endgame_nodes(game_info) <= self.endgame_nodes
+        )
+        if self.solved_endgame:
+            return self._solve_endgame(game_info)
+
+        if self.time_ms is not None:
+            with self.get_virtual_board(game_info) as vboard:
+                return self._iterative_deepening(vboard, game_info)
+
+        # If it's the first or second turn, play the book move or choose a random move
         # This is to avoid slowing the minimax algorithm too much
         # when there are many possible moves
         if game_info.turn in (0, 1):
-            return choice(game_info.possible_moves).position
+            book_move = self._get_book_move(game_info)
+            if book_move is not None:
+                return book_move
+            return self.rng.choice(game_info.possible_moves).position
+
+        return self.search_move(game_info)
+
+    def search_move(self, game_info: GameInfo) -> Position | None:
+        """
+        Searches the best move at the fixed depth of the player, on every turn,
+        which is how the moves of opening books are computed.
+        """
+        self.depth_reached = self.depth
+
+        if self.alpha_beta and self.workers > 1:
+            return self._parallel_root(game_info)
 
         if game_info.current_player == PlayerNumber.ONE:
             maximizing = True
-            best_score = -1000
+            best_score = -INFINITY
         else:
             maximizing = False
-            best_score = 1000
+            best_score = INFINITY
 
         best_move = None
 
-        with VirtualBoard(game_info.board, game_info.current_player) as vboard:
+        with self.get_virtual_board(game_info) as vboard:
+            if self.alpha_beta:
+                if self.transposition_table is not None:
+                    self.transposition_table.new_search()
+                best_move = self._alpha_beta_root(
+                    vboard, game_info.possible_moves, maximizing, self.depth
+                )
+                return best_move.position if best_move is not None else None
+
             for move in game_info.possible_moves:
-                vboard.place_marble_at_position(move.position)
+                vboard.make_move(move.index)
                 score = self._minimax(vboard, self.depth, not maximizing)
-                vboard.revert_last_move()
+                vboard.unmake_move()
 
                 if maximizing:
                     if score > best_score:
@@ -88,24 +311,49 @@ class MinimaxPlayer(Player):
 
         return best_move
 
+    def _get_book_move(self, game_info: GameInfo) -> Position | None:
+        """Get the move of the opening book in the position, or None if it has none."""
+        if self.opening_book is None:
+            return None
+
+        socket_index = self.opening_book.get_move(game_info.board.bitboard)
+        if socket_index is None:
+            return None
+
+        for move in game_info.possible_moves:
+            if move.index == socket_index:
+                return move.position
+        return None
+
     def _minimax(self, vboard: VirtualBoard, depth: int, maximizing: bool) -> int:
         """
         Returns the best score for the current player by
         recursively evaluating the board.
         """
+        self.nodes_searched += 1
 
-        if depth == 0 or vboard.is_game_over():
+        if depth == 0:
             return vboard.evaluate()
 
+        possible_moves = vboard.get_possible_moves()
+        if not possible_moves:
+            return vboard.evaluate()
+
+        if depth == 1:
+            # The children are evaluated all at once instead of being searched
+            self.nodes_searched += len(possible_moves)
+            scores = vboard.evaluate_moves(possible_moves)
+            return max(scores) if maximizing else min(scores)
+
         if maximizing:
-            best_score = -1000
+            best_score = -INFINITY
         else:
-            best_score = 1000
+            best_score = INFINITY
 
-        for move in vboard.get_possible_moves():
-            vboard.place_marble_at_position(move.position)
+        for move in possible_moves:
+            vboard.make_move(move.index)
             score = self._minimax(vboard, depth - 1, not maximizing)
-            vboard.revert_last_move()
+            vboard.unmake_move()
 
             if maximizing:
                 if score > best_score:
@@ -116,12 +364,641 @@ class MinimaxPlayer(Player):
 
         return best_score
 
+    def _iterative_deepening(
+        self, vboard: VirtualBoard, game_info: GameInfo
+    ) -> Position | None:
+        """
+        Searches one ply deeper at a time until the time budget runs out
+        and returns the best move of the deepest completed search.
+        The first search, one ply deep, is always completed.
+        """
+        start_time = time.perf_counter()
+        budget = self.time_ms / 1000
+        maximizing = game_info.current_player == PlayerNumber.ONE
+
+        # Beyond this depth the search would reach the end of the game on every branch
+        remaining_turns = 2 * MARBLES_PER_PLAYER - game_info.turn
+        max_depth = min(remaining_turns, vboard.board.bitboard.empty_mask.bit_count())
+
+        if self.transposition_table is not None:
+            self.transposition_table.new_search()
+
+        self.deadline = None
+        best_move = None
+        depth = 0
+
+        while True:
+            try:
+                best_move = self._alpha_beta_root(
+                    vboard, game_info.possible_moves, maximizing, depth, best_move
+                )
+            except SearchTimeout:
+                vboard.revert_all_moves()
+                break
+
+            self.depth_reached = depth
+            self.deadline = start_time + budget
+
+            # The next search usually takes several times longer than this one
+            elapsed = time.perf_counter() - start_time
+            if depth + 1 >= max_depth or elapsed > budget / 2:
+                break
+            depth += 1
+
+        self.deadline = None
+        self.root_searches = depth + 1
+        return best_move.position if best_move is not None else None
+
+    def _parallel_root(self, game_info: GameInfo) -> Position | None:
+        """
+        Searches the root moves in the worker processes,
+        each on its own board rebuilt from a snapshot of the real one.
+        Every move gets its exact score, so the first move with the best score
+        is the one the serial search chooses.
+        """
+        if self.pool is None:
+            self.pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+
+        snapshot = game_info.board.snapshot()
+        move_indices = [socket.index for socket in game_info.possible_moves]
+        number_of_tasks = min(len(move_indices), self.workers * TASKS_PER_WORKER)
+
+        futures = [
+            self.pool.submit(
+                search_root_moves,
+                snapshot,
+                move_indices[task::number_of_tasks],
+                self.depth,
+                self.tt_size_mb,
+            )
+            for task in range(number_of_tasks)
+        ]
+
+        scores: dict[int, int] = {}
+        for future in futures:
+            task_scores, nodes_searched = future.result()
+            scores.update(task_scores)
+            self.nodes_searched += nodes_searched
+
+        maximizing = game_info.current_player == PlayerNumber.ONE
+        best_move = None
+        best_score = -INFINITY if maximizing else INFINITY
+        for socket in game_info.possible_moves:
+            score = scores[socket.index]
+            if (maximizing and score > best_score) or (
+                not maximizing and score < best_score
+            ):
+                best_score = score
+                best_move = socket.position
+
+        return best_move
+
+    def begin_stats(self, stats: SearchStats) -> None:
+        # The table counts the hits of every search, only the ones of this search are kept
+        if self.transposition_table is not None:
+            stats.table_hits -= self.transposition_table.hits
+            stats.table_probes -= (
+                self.transposition_table.hits + self.transposition_table.misses
+            )
+        if self.search_cache is not None:
+            stats.cache_hits -= self.search_cache.hits
+            stats.cache_probes -= self.search_cache.hits + self.search_cache.misses
+
+    def end_stats(self, stats: SearchStats) -> None:
+        stats.nodes = self.nodes_searched
+        stats.cutoffs = self.cutoffs
+        if self.time_ms is not None:
+            # Every depth searched reaches the root again
+            stats.nodes_per_ply[0] = self.root_searches
+        if self.transposition_table is not None:
+            stats.table_hits += self.transposition_table.hits
+            stats.table_probes += (
+                self.transposition_table.hits + self.transposition_table.misses
+            )
+        if self.search_cache is not None:
+            stats.cache_hits += self.search_cache.hits
+            stats.cache_probes += self.search_cache.hits + self.search_cache.misses
+
+    def end_game(self) -> None:
+        if self.search_cache is not None:
+            self.search_cache.merge()
+
+    def close(self) -> None:
+        """Shuts down the worker processes, if any were started."""
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def get_move_score(self, vboard: VirtualBoard, move: Socket) -> int:
+        """Get the exact score of a move of the current player, searched to the player's depth."""
+        maximizing = vboard.current_player == PlayerNumber.ONE
+
+        vboard.make_move(move.index)
+        score = self._alpha_beta(
+            vboard, self.depth, -INFINITY, INFINITY, not maximizing
+        )
+        vboard.unmake_move()
+
+        return score
+
+    # pylint: disable=too-many-arguments, too-many-locals
+    def _alpha_beta_root(
+        self,
+        vboard: VirtualBoard,
+        possible_moves: list[Socket],
+        maximizing: bool,
+        depth: int,
+        first_move: Socket = None,
+        solve: bool = False,
+    ) -> Socket | None:
+        """
+        Returns the first move in the order of possible_moves that has the best score,
+        which is the move plain minimax chooses.
+        The moves are searched in order of immediate score gain, after first_move if given,
+        so a move listed before the best one so far only needs to tie with it,
+        while a move listed after it needs to beat it.
+        With solve, the moves are searched to the end of the game instead of to depth.
+        """
+        if solve:
+            search = functools.partial(self._solve, vboard)
+        else:
+            search = functools.partial(self._alpha_beta, vboard, depth)
+
+        ordered_moves = sorted(
+            enumerate(possible_moves),
+            key=lambda indexed_move: vboard.get_move_gain(indexed_move[1]),
+            reverse=maximizing,
+        )
+        if first_move is not None:
+            ordered_moves.sort(
+                key=lambda indexed_move: indexed_move[1] is not first_move
+            )
+
+        best_index = len(possible_moves)
+        best_score = -INFINITY if maximizing else INFINITY
+
+        for index, move in ordered_moves:
+            tie_breaker = 1 if index < best_index else 0
+
+            vboard.make_move(move.index)
+            if maximizing:
+                alpha = best_score - tie_breaker
+                score = search(alpha, INFINITY, False)
+                improves = score > alpha
+            else:
+                beta = best_score + tie_breaker
+                score = search(-INFINITY, beta, True)
+                improves = score < beta
+            vboard.unmake_move()
+
+            if improves:
+                best_score = score
+                best_index = index
+
+        if best_index == len(possible_moves):
+            return None
+        return possible_moves[best_index]
+
+    # pylint: disable=too-many-branches, too-many-statements
+    def _alpha_beta(
+        self, vboard: VirtualBoard, depth: int, alpha: int, beta: int, maximizing: bool
+    ) -> int:
+        """
+        Returns the best score for the current player if it lies between alpha and beta.
+        Otherwise returns a bound: at most alpha, or at least beta.
+        Raises SearchTimeout if the deadline has passed.
+        """
+        self.nodes_searched += 1
+
+        if self.deadline is not None and self.nodes_searched >= self.next_time_check:
+            self.next_time_check = self.nodes_searched + TIME_CHECK_INTERVAL
+            if time.perf_counter() > self.deadline:
+                raise SearchTimeout()
+
+        if depth == 0:
+            return vboard.evaluate()
+
+        entry = None
+        if self.transposition_table is not None:
+            entry = self.transposition_table.probe(vboard.hash)
+        if entry is None and self.search_cache is not None:
+            entry = self.search_cache.probe(vboard.hash)
+
+        table_move = NO_SOCKET
+        if entry is not None:
+            if entry.cuts_off(depth, alpha, beta):
+                return entry.score
+            table_move = entry.best_move
+
+        possible_moves = vboard.get_possible_moves()
+        if not possible_moves:
+            return vboard.evaluate()
+
+        original_alpha = alpha
+        original_beta = beta
+        best_move = NO_SOCKET
+
+        if depth == 1:
+            # The children are evaluated all at once instead of being searched,
+            # their best evaluation is the score of the position
+            self.nodes_searched += len(possible_moves)
+            scores = vboard.evaluate_moves(possible_moves)
+            best_score = max(scores) if maximizing else min(scores)
+            best_move = possible_moves[scores.index(best_score)].index
+            if (maximizing and best_score >= beta) or (
+                not maximizing and best_score <= alpha
+            ):
+                self.cutoffs += 1
+        else:
+            possible_moves.sort(key=vboard.get_move_gain, reverse=maximizing)
+            if table_move != NO_SOCKET:
+                # The best move of a previous search is tried first
+                possible_moves.sort(key=lambda socket: socket.index != table_move)
+
+            if maximizing:
+                best_score = -INFINITY
+                for move in possible_moves:
+                    vboard.make_move(move.index)
+                    score = self._alpha_beta(vboard, depth - 1, alpha, beta, False)
+                    vboard.unmake_move()
+
+                    if score > best_score:
+                        best_score = score
+                        best_move = move.index
+                    alpha = max(alpha, score)
+                    if alpha >= beta:
+                        self.cutoffs += 1
+                        break
+            else:
+                best_score = INFINITY
+                for move in possible_moves:
+                    vboard.make_move(move.index)
+                    score = self._alpha_beta(vboard, depth - 1, alpha, beta, True)
+                    vboard.unmake_move()
+
+                    if score < best_score:
+                        best_score = score
+                        best_move = move.index
+                    beta = min(beta, score)
+                    if alpha >= beta:
+                        self.cutoffs += 1
+                        break
+
+        if depth == 1:
+            # Every child was evaluated, the score is exact whatever the window
+            bound = Bound.EXACT
+        elif best_score <= original_alpha:
+            bound = Bound.UPPER
+        elif best_score >= original_beta:
+            bound = Bound.LOWER
+        else:
+            bound = Bound.EXACT
+        if self.transposition_table is not None:
+            self.transposition_table.store(
+                vboard.hash, depth, bound, best_score, best_move
+            )
+        if self.search_cache is not None:
+            self.search_cache.store(vboard.hash, depth, bound, best_score, best_move)
+
+        return best_score
+
+    def _estimate_endgame_nodes(self, game_info: GameInfo) -> float:
+        """
+        Estimates the number of nodes of the game tree left to the end of the game
+        with Knuth's method: along a random path, the product of the numbers of moves
+        of the positions before a ply estimates the number of nodes of that ply.
+        The estimate is the average over ENDGAME_PROBES paths,
+        and stops growing once it is certain to exceed endgame_nodes.
+        """
+        bitboard = game_info.board.bitboard
+        bitboard.set_player_to_move(game_info.current_player)
+        marbles_left = (
+            2 * MARBLES_PER_PLAYER
+            - (bitboard.full_mask ^ bitboard.empty_mask).bit_count()
+        )
+        budget = self.endgame_nodes * ENDGAME_PROBES
+
+        total_nodes = 0
+        for _ in range(ENDGAME_PROBES):
+            nodes = 1
+            ply_nodes = 1
+            moves_made = 0
+            while moves_made < marbles_left and total_nodes + nodes <= budget:
+                mask = bitboard.get_possible_moves_mask(
+                    PLAYERS[bitboard.player_to_move]
+                )
+                if not mask:
+                    break
+                moves = list(iterate_bits(mask))
+                ply_nodes *= len(moves)
+                nodes += ply_nodes
+                bitboard.make_move(self.rng.choice(moves))
+                moves_made += 1
+
+            for _ in range(moves_made):
+                bitboard.unmake_move()
+
+            total_nodes += nodes
+            if total_nodes > budget:
+                break
+
+        return total_nodes / ENDGAME_PROBES
+
+    def _solve_endgame(self, game_info: GameInfo) -> Position | None:
+        """Returns the move minimax would choose searching to the end of the game."""
+        if len(self.endgame_table) > MAX_ENDGAME_ENTRIES:
+            self.endgame_table.clear()
+
+        maximizing = game_info.current_player == PlayerNumber.ONE
+        with self.get_virtual_board(game_info) as vboard:
+            best_move = self._alpha_beta_root(
+                vboard, game_info.possible_moves, maximizing, 0, solve=True
+            )
+        return best_move.position if best_move is not None else None
+
+    # pylint: disable=too-many-return-statements
+    def _solve(
+        self, vboard: VirtualBoard, alpha: int, beta: int, maximizing: bool
+    ) -> int:
+        """
+        Returns the score the game ends with if both players play their best moves,
+        if it lies between alpha and beta.
+        Otherwise returns a bound: at most alpha, or at least beta.
+        Positions whose score bounds (see BitBoard.get_score_bounds) are outside the window
+        are not searched.
+        """
+        self.nodes_searched += 1
+        bitboard = vboard.bitboard
+
+        marbles_left = (
+            2 * MARBLES_PER_PLAYER
+            - (bitboard.full_mask ^ bitboard.empty_mask).bit_count()
+        )
+        if marbles_left <= 0:
+            return vboard.evaluate()
+
+        entry = self.endgame_table.get(vboard.hash)
+        if entry is not None:
+            bound, score = entry
+            if (
+                bound == Bound.EXACT
+                or (bound == Bound.LOWER and score >= beta)
+                or (bound == Bound.UPPER and score <= alpha)
+            ):
+                return score
+
+        lowest, highest = bitboard.get_score_bounds()
+        if highest <= alpha:
+            return highest
+        if lowest >= beta:
+            return lowest
+
+        possible_moves = vboard.get_possible_moves()
+        if not possible_moves:
+            return vboard.evaluate()
+
+        if marbles_left == 1:
+            # The last move of the game is evaluated without being made
+            self.nodes_searched += len(possible_moves)
+            scores = vboard.evaluate_moves(possible_moves)
+            return max(scores) if maximizing else min(scores)
+
+        possible_moves.sort(key=vboard.get_move_gain, reverse=maximizing)
+
+        original_alpha = alpha
+        original_beta = beta
+
+        if maximizing:
+            best_score = -INFINITY
+            for move in possible_moves:
+                vboard.make_move(move.index)
+                score = self._solve(vboard, alpha, beta, False)
+                vboard.unmake_move()
+
+                best_score = max(best_score, score)
+                alpha = max(alpha, score)
+                if alpha >= beta:
+                    self.cutoffs += 1
+                    break
+        else:
+            best_score = INFINITY
+            for move in possible_moves:
+                vboard.make_move(move.index)
+                score = self._solve(vboard, alpha, beta, True)
+                vboard.unmake_move()
+
+                best_score = min(best_score, score)
+                beta = min(beta, score)
+                if alpha >= beta:
+                    self.cutoffs += 1
+                    break
+
+        if best_score <= original_alpha:
+            bound = Bound.UPPER
+        elif best_score >= original_beta:
+            bound = Bound.LOWER
+        else:
+            bound = Bound.EXACT
+        self.endgame_table[vboard.hash] = (bound, best_score)
+
+        return best_score
+
+
+def search_root_moves(
+    snapshot: GameState,
+    move_indices: list[int],
+    depth: int,
+    tt_size_mb: float,
+) -> tuple[dict[int, int], int]:
+    """
+    Runs in a worker process of MinimaxPlayer.
+    Rebuilds the board and returns the exact score of each root move
+    by its socket index, along with the number of nodes searched.
+    """
+    _board = BoardInterface.from_snapshot(snapshot)
+    sockets = _board.get_all_sockets()
+    player = MinimaxPlayer(depth, tt_size_mb=tt_size_mb)
+
+    with VirtualBoard(_board, PLAYERS[snapshot.player_to_move]) as vboard:
+        scores = {i: player.get_move_score(vboard, sockets[i]) for i in move_indices}
+
+    return scores, player.nodes_searched
+
+
+class MCTSPlayer(Player):
+    """
+    A player that chooses its move with Monte Carlo tree search (UCT).
+
+    Every iteration walks down the tree to a position with an untried move,
+    adds that move to the tree and plays the rest of the game out on a VirtualBoard:
+    with random moves, or with naive_rollouts, the move with the highest immediate score gain.
+    The move visited the most is played.
+
+    The search runs for a number of iterations, or for time_ms milliseconds if given.
+    The subtree of the position after the player's move and the opponent's reply
+    is kept for the next turn.
+    """
+
+    # pylint: disable=too-many-instance-attributes, too-many-arguments
+    def __init__(
+        self,
+        iterations: int = 1000,
+        time_ms: float = None,
+        exploration: float = 1.4,
+        naive_rollouts: bool = False,
+        seed: int = None,
+    ):
+        super().__init__(seed)
+
+        self.iterations = iterations
+        self.time_ms = time_ms
+        self.exploration = exploration
+        self.naive_rollouts = naive_rollouts
+
+        # The node of the position after the last move chosen
+        self.tree: MCTSNode = None
+
+        self.playouts = 0
+        self.playouts_per_second = 0.0
+        self.reused_playouts = 0
+
+    def __getstate__(self) -> dict:
+        # The search tree is not sent to other processes
+        state = self.__dict__.copy()
+        state["tree"] = None
+        return state
+
+    def __str__(self) -> str:
+        if self.time_ms is not None:
+            return self.__class__.__name__ + f"({self.time_ms}ms)"
+        return self.__class__.__name__ + f"({self.iterations})"
+
+    def get_next_move(self, game_info: GameInfo) -> Position | None:
+        start_time = time.perf_counter()
+        sockets = game_info.board.get_all_sockets()
+
+        with VirtualBoard(game_info.board, game_info.current_player) as vboard:
+            root = self._get_root(vboard)
+            self.reused_playouts = root.visits
+
+            self.playouts = 0
+            deadline = None
+            if self.time_ms is not None:
+                deadline = start_time + self.time_ms / 1000
+
+            # At least one iteration is run, so that the root has a child to play
+            while self.playouts == 0 or (
+                time.perf_counter() < deadline
+                if deadline is not None
+                else self.playouts < self.iterations
+            ):
+                self._run_iteration(vboard, root)
+                self.playouts += 1
+
+        elapsed = time.perf_counter() - start_time
+        self.playouts_per_second = self.playouts / elapsed if elapsed > 0 else 0.0
+
+        self.tree = root.get_most_visited_child()
+        if self.tree is None:
+            return self.rng.choice(game_info.possible_moves).position
+        return sockets[self.tree.move].position
+
+    def _get_root(self, vboard: VirtualBoard) -> MCTSNode:
+        """
+        Get the node of the current position: the child of the tree for the opponent's last move
+        if it was searched, otherwise a new node.
+        """
+        bitboard = vboard.bitboard
+        opponent_index = 1 - bitboard.player_to_move
+
+        if self.tree is not None:
+            root = self.tree.children.get(bitboard.last_marbles[opponent_index])
+            self.tree = None
+            if root is not None and root.hash == vboard.hash:
+                root.parent = None
+                return root
+
+        return MCTSNode(
+            NO_SOCKET, None, opponent_index, vboard.hash, self._get_moves(vboard)
+        )
+
+    def _get_moves(self, vboard: VirtualBoard) -> list[int]:
+        """
+        Get the socket indices of the moves of the current player in random order,
+        or no moves if the game is over.
+        """
+        bitboard = vboard.bitboard
+        if (
+            bitboard.full_mask ^ bitboard.empty_mask
+        ).bit_count() >= 2 * MARBLES_PER_PLAYER:
+            return []
+
+        moves = list(
+            iterate_bits(bitboard.get_possible_moves_mask(vboard.current_player))
+        )
+        self.rng.shuffle(moves)
+        return moves
+
+    def _run_iteration(self, vboard: VirtualBoard, root: MCTSNode) -> None:
+        """Selects a node, expands it with one of its untried moves, plays out and backs up."""
+        node = root
+        while not node.untried_moves and node.children:
+            node = node.select_child(self.exploration)
+            vboard.make_move(node.move)
+
+        if node.untried_moves:
+            move = node.untried_moves.pop()
+            vboard.make_move(move)
+            node = node.add_child(move, vboard.hash, self._get_moves(vboard))
+
+        winner = self._play_out(vboard)
+        while node is not None:
+            node.update(winner)
+            node = node.parent
+
+        vboard.revert_all_moves()
+
+    def _play_out(self, vboard: VirtualBoard) -> int | None:
+        """
+        Plays the game to the end and returns the index of the winner, or None for a draw.
+        """
+        bitboard = vboard.bitboard
+        marbles = (bitboard.full_mask ^ bitboard.empty_mask).bit_count()
+
+        while marbles < 2 * MARBLES_PER_PLAYER:
+            mask = bitboard.get_possible_moves_mask(PLAYERS[bitboard.player_to_move])
+            if not mask:
+                break
+
+            moves = list(iterate_bits(mask))
+            if self.naive_rollouts:
+                # The first of the moves with the best gain, in random order
+                self.rng.shuffle(moves)
+                player_index = bitboard.player_to_move
+                sign = 1 if player_index == 0 else -1
+                move = max(
+                    moves,
+                    key=lambda i: sign * bitboard.get_score_change(i, player_index),
+                )
+            else:
+                move = self.rng.choice(moves)
+
+            vboard.make_move(move)
+            marbles += 1
+
+        score = vboard.evaluate()
+        if score > 0:
+            return 0
+        if score < 0:
+            return 1
+        return None
+
 
 class RandomPlayer(Player):
     """A player that chooses a random move"""
 
     def get_next_move(self, game_info: GameInfo) -> Position:
-        return choice(game_info.possible_moves).position
+        return self.rng.choice(game_info.possible_moves).position
 
 
 class HumanPlayer(Player):
@@ -4,18 +4,31 @@ from cmath import sqrt
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Position:
-    """Position class for the game."""
+    """
+    Position class for the game.
+    Positions are immutable and hashable, so they can be used as dict keys and in sets.
+    Position.get returns a shared instance for integer coordinates.
+    """
 
     x: int
     y: int
 
+    @staticmethod
+    def get(x: int, y: int) -> "Position":
+        """Get the shared position with the given integer coordinates."""
+        key = (x, y)
+        position = INTERNED_POSITIONS.get(key)
+        if position is None:
+            position = INTERNED_POSITIONS[key] = Position(x, y)
+        return position
+
     def __add__(self, other: "Position") -> "Position":
-        return Position(self.x + other.x, self.y + other.y)
+        return Position.get(self.x + other.x, self.y + other.y)
 
     def __sub__(self, other: "Position") -> "Position":
-        return Position(self.x - other.x, self.y - other.y)
+        return Position.get(self.x - other.x, self.y - other.y)
 
     def distance_from(self, other: "Position") -> float:
         """Calculate the distance between two positions."""
@@ -24,3 +37,7 @@ class Position:
     def is_negative(self) -> bool:
         """Check if the position is negative."""
         return self.x < 0 or self.y < 0
+
+
+# Every position created by Position.get, by its coordinates
+INTERNED_POSITIONS: dict[tuple[int, int], Position] = {}
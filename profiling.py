@@ -0,0 +1,156 @@
+"""
+This file contains the profiler hooks that Kulami.play and MatchMaker accept,
+which profile only the selected turns or games with cProfile or tracemalloc.
+"""
+
+import contextlib
+import cProfile
+import itertools
+import os
+import tracemalloc
+from typing import Container
+
+from enums import PlayerNumber
+
+# Number of lines of the largest allocations written by TracemallocHook
+TOP_ALLOCATIONS = 20
+
+# Numbers the games played by this process, which receives a copy of the hook with every match
+GAME_NUMBERS = itertools.count(1)
+
+
+# pylint: disable=too-many-instance-attributes
+class ProfilerHook:
+    """
+    Chooses the turns to profile and profiles them, or profiles whole games.
+
+    A turn is selected if the player to move is named player (its class name or str),
+    its number is in turns and it has at least min_branching_factor possible moves.
+    One in every `every` selected turns of each game is profiled,
+    so that long tournaments can be sampled.
+    With whole_games, every game is profiled as a whole instead, and no turn is.
+    The files are written to directory, named after the player, the turn number,
+    the branching factor and the game, which is tagged with the process and its number in it.
+
+    Hooks are sent to the worker processes of MatchMaker with the matches.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        directory: str = "profiles",
+        player: str = None,
+        turns: Container[int] = None,
+        min_branching_factor: int = 0,
+        every: int = 1,
+        whole_games: bool = False,
+    ) -> None:
+        self.directory = directory
+        self.player = player
+        self.turns = turns
+        self.min_branching_factor = min_branching_factor
+        self.every = every
+        self.whole_games = whole_games
+
+        self.game_tag = ""
+        self.turns_selected = 0
+
+    def profile_game(self, game) -> contextlib.AbstractContextManager:
+        """Get the context the whole game is played in."""
+        self.game_tag = f"{os.getpid()}-{next(GAME_NUMBERS)}"
+        self.turns_selected = 0
+        if not self.whole_games:
+            return contextlib.nullcontext()
+
+        return self.profile(f"{game.player1}_vs_{game.player2}_game{self.game_tag}")
+
+    def profile_turn(self, game) -> contextlib.AbstractContextManager:
+        """Get the context the current turn of the game is played in."""
+        # The turns are already inside the session of the whole game
+        if self.whole_games:
+            return contextlib.nullcontext()
+
+        if game.get_current_player() == PlayerNumber.ONE:
+            player = game.player1
+        else:
+            player = game.player2
+        branching_factor = len(game.possible_moves)
+
+        if not self.is_selected(player, game.turn, branching_factor):
+            return contextlib.nullcontext()
+
+        self.turns_selected += 1
+        if (self.turns_selected - 1) % self.every != 0:
+            return contextlib.nullcontext()
+
+        return self.profile(
+            f"{player}_turn{game.turn}_b{branching_factor}_game{self.game_tag}"
+        )
+
+    def is_selected(self, player, turn: int, branching_factor: int) -> bool:
+        """Check if the turn of the player is one of the turns to profile."""
+        if self.player is not None and self.player not in (
+            player.__class__.__name__,
+            str(player),
+        ):
+            return False
+        if self.turns is not None and turn not in self.turns:
+            return False
+        return branching_factor >= self.min_branching_factor
+
+    def get_path(self, name: str, extension: str) -> str:
+        """Get the path of a file of the directory, creating the directory if needed."""
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, name + extension)
+
+    def profile(self, name: str) -> contextlib.AbstractContextManager:
+        """Get the context that profiles what runs in it and writes the files with the name."""
+        raise NotImplementedError("profile not implemented")
+
+
+class CProfileHook(ProfilerHook):
+    """
+    Profiles the selected turns or games with cProfile
+    and dumps the statistics to a .prof file, which pstats and snakeviz read.
+    """
+
+    @contextlib.contextmanager
+    def profile(self, name: str):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(self.get_path(name, ".prof"))
+
+
+class TracemallocHook(ProfilerHook):
+    """
+    Traces the memory allocated during the selected turns or games with tracemalloc.
+    The snapshot taken at the end is dumped to a .tracemalloc file,
+    which tracemalloc.Snapshot.load reads, and the peak memory and largest allocations
+    still alive are written to a .txt file.
+    """
+
+    @contextlib.contextmanager
+    def profile(self, name: str):
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.clear_traces()
+        tracemalloc.reset_peak()
+
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if started:
+                tracemalloc.stop()
+
+            snapshot.dump(self.get_path(name, ".tracemalloc"))
+            with open(self.get_path(name, ".txt"), "w", encoding="utf-8") as file:
+                file.write(f"Peak memory: {peak / 1024:.1f} KiB\n")
+                for statistic in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+                    file.write(f"{statistic}\n")
@@ -0,0 +1,222 @@
+"""
+This file contains the SearchCache class, which keeps the results of searched positions
+on disk, so that the games played on the same board reuse the searches of the previous ones.
+
+The cache is an SQLite database that every process opens on its own:
+readers do not block each other, and the writes of the processes are serialized by SQLite.
+A player reads the entries of a board into memory the first time it searches it,
+and merges the entries of its game into the database when the game is over.
+"""
+
+import os
+import sqlite3
+import time
+from enums import Bound
+from transposition import TableEntry
+
+DEFAULT_CACHE_PATH = "search.cache"
+
+# Number of entries kept in the file, the least recently used ones are removed beyond it
+DEFAULT_MAX_ENTRIES = 1_000_000
+
+# Shallower searches are cheaper to repeat than to store
+DEFAULT_MIN_DEPTH = 2
+
+# Seconds a process waits for the writes of another process to finish
+LOCK_TIMEOUT = 60
+
+# Every process keeps the caches it opened, by path
+OPEN_CACHES: dict[str, "SearchCache"] = {}
+
+
+def to_signed(key: int) -> int:
+    """Get the 64-bit key as the signed integer SQLite stores."""
+    return key - (1 << 64) if key >= 1 << 63 else key
+
+
+def to_unsigned(key: int) -> int:
+    """Get the key back from the signed integer SQLite stores."""
+    return key + (1 << 64) if key < 0 else key
+
+
+# pylint: disable=too-many-instance-attributes
+class SearchCache:
+    """
+    Searched positions of every board, stored in an SQLite database by their Zobrist hash,
+    whose layout key keeps the positions of different boards apart.
+
+    Only searches at least min_depth plies deep are stored. Beyond max_entries entries,
+    the ones not stored or found for the longest time are removed when a game is merged.
+    Caches pickle as their path, so worker processes open the file themselves.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        min_depth: int = DEFAULT_MIN_DEPTH,
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.min_depth = min_depth
+
+        self.process_id = os.getpid()
+        self.connection = sqlite3.connect(path, timeout=LOCK_TIMEOUT)
+        # Readers see the last merge while another process writes
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS positions ("
+                "key INTEGER PRIMARY KEY, layout INTEGER NOT NULL, depth INTEGER NOT NULL, "
+                "bound INTEGER NOT NULL, score INTEGER NOT NULL, best_move INTEGER NOT NULL, "
+                "last_used REAL NOT NULL)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS positions_layout ON positions (layout)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS positions_last_used ON positions (last_used)"
+            )
+
+        # Entries of the board being played, read from the file
+        self.layout_key: int = None
+        self.entries: dict[int, TableEntry] = {}
+        # Entries stored since the last merge, and keys of the entries found since then
+        self.new_entries: dict[int, TableEntry] = {}
+        self.used_keys: set[int] = set()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        (number_of_entries,) = self.connection.execute(
+            "SELECT COUNT(*) FROM positions"
+        ).fetchone()
+        return number_of_entries
+
+    def __reduce__(self) -> tuple:
+        return (open_search_cache, (self.path, self.max_entries, self.min_depth))
+
+    def __enter__(self) -> "SearchCache":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Merges the entries not merged yet and closes the file."""
+        self.merge()
+        OPEN_CACHES.pop(self.path, None)
+        self.connection.close()
+
+    def load(self, layout_key: int) -> None:
+        """Reads the entries of the board with the layout key, unless it is already read."""
+        if layout_key == self.layout_key:
+            return
+
+        self.merge()
+        self.layout_key = layout_key
+        rows = self.connection.execute(
+            "SELECT key, depth, bound, score, best_move FROM positions WHERE layout = ?",
+            (to_signed(layout_key),),
+        )
+        self.entries = {
+            to_unsigned(key): TableEntry(
+                to_unsigned(key), depth, Bound(bound), score, best_move, 0
+            )
+            for key, depth, bound, score, best_move in rows
+        }
+
+    def probe(self, key: int) -> TableEntry | None:
+        """Get the entry stored for the position, or None."""
+        entry = self.entries.get(key)
+
+        if entry is not None:
+            self.hits += 1
+            self.used_keys.add(key)
+            return entry
+
+        self.misses += 1
+        return None
+
+    # pylint: disable=too-many-arguments
+    def store(
+        self, key: int, depth: int, bound: Bound, score: int, best_move: int
+    ) -> None:
+        """
+        Stores the result of a search until the next merge,
+        unless it is too shallow or the position was already searched as deep.
+        """
+        if depth < self.min_depth:
+            return
+
+        for entry in (self.entries.get(key), self.new_entries.get(key)):
+            if entry is not None and entry.depth >= depth:
+                return
+
+        self.new_entries[key] = TableEntry(key, depth, bound, score, best_move, 0)
+
+    def merge(self) -> None:
+        """
+        Writes the entries stored since the last merge to the file,
+        where a deeper search of the same position is kept,
+        and removes the least recently used entries beyond max_entries.
+        """
+        if not self.new_entries and not self.used_keys:
+            return
+
+        now = time.time()
+        layout = to_signed(self.layout_key)
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO positions VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET depth = excluded.depth, "
+                "bound = excluded.bound, score = excluded.score, "
+                "best_move = excluded.best_move, last_used = excluded.last_used "
+                "WHERE excluded.depth > positions.depth",
+                (
+                    (
+                        to_signed(key),
+                        layout,
+                        entry.depth,
+                        entry.bound.value,
+                        entry.score,
+                        entry.best_move,
+                        now,
+                    )
+                    for key, entry in self.new_entries.items()
+                ),
+            )
+            self.connection.executemany(
+                "UPDATE positions SET last_used = ? WHERE key = ?",
+                ((now, to_signed(key)) for key in self.used_keys),
+            )
+            self.connection.execute(
+                "DELETE FROM positions WHERE key IN (SELECT key FROM positions "
+                "ORDER BY last_used LIMIT MAX(0, (SELECT COUNT(*) FROM positions) - ?))",
+                (self.max_entries,),
+            )
+
+        self.entries.update(self.new_entries)
+        self.new_entries = {}
+        self.used_keys = set()
+
+    def get_hit_rate(self) -> float:
+        """Get the fraction of probes that found their position."""
+        probes = self.hits + self.misses
+        if probes == 0:
+            return 0.0
+        return self.hits / probes
+
+
+def open_search_cache(
+    path: str,
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+    min_depth: int = DEFAULT_MIN_DEPTH,
+) -> SearchCache:
+    """Get the cache at the given path, opening it if this process has not already."""
+    cache = OPEN_CACHES.get(path)
+    # Forked processes inherit the caches of their parent, whose connections they cannot use
+    if cache is None or cache.process_id != os.getpid():
+        cache = OPEN_CACHES[path] = SearchCache(path, max_entries, min_depth)
+    return cache
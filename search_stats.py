@@ -0,0 +1,141 @@
+"""
+This file contains the SearchStats class, which describes the searches of a player,
+and the MeasuredVirtualBoard class, which collects them during a search.
+"""
+
+import time
+from dataclasses import dataclass, field
+from board import BoardInterface, VirtualBoard
+from enums import PlayerNumber
+from tile import Socket
+
+
+# pylint: disable=too-many-instance-attributes
+@dataclass
+class SearchStats:
+    """
+    Statistics of the search of one move, or added up over several moves.
+    nodes_per_ply counts the positions reached at every ply below the root,
+    which is ply 0, and the seconds are the time spent in each operation of the board.
+    """
+
+    moves: int = 0
+    nodes: int = 0
+    leaf_evaluations: int = 0
+    nodes_per_ply: list[int] = field(default_factory=list)
+    cutoffs: int = 0
+    table_hits: int = 0
+    table_probes: int = 0
+    cache_hits: int = 0
+    cache_probes: int = 0
+    move_generation_seconds: float = 0.0
+    evaluation_seconds: float = 0.0
+    make_unmake_seconds: float = 0.0
+    total_seconds: float = 0.0
+
+    def __str__(self) -> str:
+        branching_factors = ", ".join(
+            f"{factor:.1f}" for factor in self.get_branching_factors()
+        )
+        return (
+            f"{self.moves} moves in {self.total_seconds:.2f} s, "
+            f"{self.nodes} nodes, {self.leaf_evaluations} leaf evaluations, "
+            f"{self.cutoffs} cutoffs, {self.table_hits}/{self.table_probes} table hits, "
+            f"{self.cache_hits}/{self.cache_probes} cache hits "
+            f"({self.get_cache_hit_rate():.1%}), "
+            f"branching factors [{branching_factors}], "
+            f"{self.move_generation_seconds:.2f} s move generation, "
+            f"{self.evaluation_seconds:.2f} s evaluation, "
+            f"{self.make_unmake_seconds:.2f} s make/unmake"
+        )
+
+    def count_node(self, ply: int, number_of_nodes: int = 1) -> None:
+        """Counts positions reached at the given ply."""
+        while len(self.nodes_per_ply) <= ply:
+            self.nodes_per_ply.append(0)
+        self.nodes_per_ply[ply] += number_of_nodes
+
+    def get_branching_factors(self) -> list[float]:
+        """
+        Get the effective branching factor of every ply:
+        the number of positions reached at the next ply per position reached at this one.
+        """
+        return [
+            children / parents
+            for parents, children in zip(self.nodes_per_ply, self.nodes_per_ply[1:])
+            if parents > 0
+        ]
+
+    def get_cache_hit_rate(self) -> float:
+        """Get the fraction of the probes of the search cache that found their position."""
+        if self.cache_probes == 0:
+            return 0.0
+        return self.cache_hits / self.cache_probes
+
+    def add(self, other: "SearchStats") -> None:
+        """Adds the statistics of other searches to these ones."""
+        self.moves += other.moves
+        self.nodes += other.nodes
+        self.leaf_evaluations += other.leaf_evaluations
+        for ply, number_of_nodes in enumerate(other.nodes_per_ply):
+            self.count_node(ply, number_of_nodes)
+        self.cutoffs += other.cutoffs
+        self.table_hits += other.table_hits
+        self.table_probes += other.table_probes
+        self.cache_hits += other.cache_hits
+        self.cache_probes += other.cache_probes
+        self.move_generation_seconds += other.move_generation_seconds
+        self.evaluation_seconds += other.evaluation_seconds
+        self.make_unmake_seconds += other.make_unmake_seconds
+        self.total_seconds += other.total_seconds
+
+
+class MeasuredVirtualBoard(VirtualBoard):
+    """
+    VirtualBoard that counts the positions reached at every ply and the leaf evaluations,
+    and times move generation, evaluation and making and taking back moves.
+    Players only search on it when they collect statistics, so the other searches pay nothing.
+    """
+
+    def __init__(
+        self,
+        interface: BoardInterface,
+        current_player: PlayerNumber,
+        stats: SearchStats,
+    ) -> None:
+        super().__init__(interface, current_player)
+        self.stats = stats
+        self.stats.count_node(0)
+
+    def make_move(self, socket_index: int) -> None:
+        start_time = time.perf_counter()
+        super().make_move(socket_index)
+        self.stats.make_unmake_seconds += time.perf_counter() - start_time
+        self.stats.count_node(self.number_of_moves_made)
+
+    def unmake_move(self) -> None:
+        start_time = time.perf_counter()
+        super().unmake_move()
+        self.stats.make_unmake_seconds += time.perf_counter() - start_time
+
+    def get_possible_moves(self) -> list[Socket]:
+        start_time = time.perf_counter()
+        possible_moves = super().get_possible_moves()
+        self.stats.move_generation_seconds += time.perf_counter() - start_time
+        return possible_moves
+
+    def evaluate(self) -> int:
+        start_time = time.perf_counter()
+        evaluation = super().evaluate()
+        self.stats.evaluation_seconds += time.perf_counter() - start_time
+        self.stats.leaf_evaluations += 1
+        return evaluation
+
+    def evaluate_moves(self, moves: list[Socket]) -> list[int]:
+        start_time = time.perf_counter()
+        evaluations = super().evaluate_moves(moves)
+        self.stats.evaluation_seconds += time.perf_counter() - start_time
+        # The moves are evaluated without being made, their positions are still reached
+        self.stats.leaf_evaluations += len(moves)
+        self.stats.count_node(self.number_of_moves_made + 1, len(moves))
+        return evaluations
@@ -8,22 +8,28 @@ The QuantumTileMaker class is used to create QuantumTiles of various sizes.
 
 from dataclasses import dataclass
 from random import choice
+from typing import NamedTuple
 from enums import SocketState, TileOwner
 from position import Position
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class Socket:
-    """Represents a socket on the board."""
+    """
+    Represents a socket on the board.
+    Sockets compare and hash by identity, since their state changes during the game.
+    """
 
     position: Position
     tile_id: int
     state: SocketState
+    index: int
 
     def __init__(self, position: Position):
         self.position = position
         self.state: SocketState = SocketState.EMPTY
         self.tile_id = -1
+        self.index = -1
 
     def is_empty(self) -> bool:
         """Check if the socket is empty."""
@@ -34,9 +40,9 @@ class Socket:
         self.tile_id = _id
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class Tile:
-    """Represents a tile on the board."""
+    """Represents a tile on the board. Tiles compare and hash by identity."""
 
     sockets: list[Socket]
     id: int
@@ -78,6 +84,41 @@ class Tile:
         return len(self.sockets)
 
 
+class Placement(NamedTuple):
+    """
+    The positions covered by a tile placed on a grid,
+    as a bitmask with bit x * size + y set for every position, and their bounding box.
+    """
+
+    positions: tuple[Position, ...]
+    mask: int
+    min_x: int
+    max_x: int
+    min_y: int
+    max_y: int
+
+    @staticmethod
+    def from_positions(positions: tuple[Position, ...], size: int) -> "Placement":
+        """Create the placement covering the given positions on a grid of the given size."""
+        mask = 0
+        for position in positions:
+            mask |= 1 << (position.x * size + position.y)
+
+        return Placement(
+            positions,
+            mask,
+            min(position.x for position in positions),
+            max(position.x for position in positions),
+            min(position.y for position in positions),
+            max(position.y for position in positions),
+        )
+
+
+# Placements of every shape at every position of a grid, indexed by x * size + y,
+# by shape and grid size
+PLACEMENT_CATALOGS: dict[tuple, list[tuple[Placement, ...] | None]] = {}
+
+
 class QuantumTile:
     """
     Represents a tile as a superposition of all the ways
@@ -107,6 +148,9 @@ class QuantumTile:
         self.positions = self.raw_positions.copy()
         self.rotated_positions = self.rotated_raw_positions.copy()
 
+        # Tiles with the same shape share their placement catalog
+        self.shape = (tuple(self.raw_positions), tuple(self.rotated_raw_positions))
+
     @staticmethod
     def assign_id() -> int:
         """Assign a unique id to the tile."""
@@ -125,6 +169,32 @@ class QuantumTile:
         for pos in self.rotated_raw_positions:
             self.rotated_positions.append(pos + position)
 
+    @staticmethod
+    def get_placements(
+        raw_positions: list[Position], positions: list[Position]
+    ) -> list[tuple[Position, ...]]:
+        """
+        Get the positions covered by every possible tile at a specified position,
+        given the raw and the real positions.
+        Placements with a negative position are left out.
+        """
+        placements: list[tuple[Position, ...]] = []
+        for raw_position in raw_positions:
+            placement = tuple(pos - raw_position for pos in positions)
+            if not any(pos.is_negative() for pos in placement):
+                placements.append(placement)
+        return placements
+
+    @staticmethod
+    def make_tile(placement: tuple[Position, ...], _id: int) -> Tile:
+        """Create a tile with an empty socket at every position of the placement."""
+        tile_sockets: list[Socket] = []
+        for position in placement:
+            socket = Socket(position)
+            socket.set_tile_id(_id)
+            tile_sockets.append(socket)
+        return Tile(tile_sockets, _id)
+
     @staticmethod
     def get_tiles(
         raw_positions: list[Position], positions: list[Position], _id: int
@@ -133,41 +203,60 @@ class QuantumTile:
         Get all the possible tiles at a specified position,
         given the raw and the real positions.
         """
-        tile_list: list[Tile] = []
-        for raw_position in raw_positions:
-            tile_sockets: list[Socket] = []
-            out_of_bounds = False
-            for pos in positions:
-                possible_position = pos - raw_position
-                if possible_position.is_negative():
-                    out_of_bounds = True
-                    break
+        return [
+            QuantumTile.make_tile(placement, _id)
+            for placement in QuantumTile.get_placements(raw_positions, positions)
+        ]
+
+    def get_possible_placements_at(
+        self, position: Position
+    ) -> list[tuple[Position, ...]]:
+        """
+        Get the positions covered by every possible tile at a specified position,
+        in the same order as get_possible_tiles_at, without creating the tiles.
+        """
+        self.move_to(position)
 
-                possible_socket = Socket(possible_position)
+        placements = QuantumTile.get_placements(self.raw_positions, self.positions)
+        placements += QuantumTile.get_placements(
+            self.rotated_raw_positions, self.rotated_positions
+        )
 
-                possible_socket.set_tile_id(_id)
-                possible_socket.state = SocketState.EMPTY
+        return placements
 
-                tile_sockets.append(possible_socket)
-            if not out_of_bounds:
-                tile_list.append(Tile(tile_sockets, _id))
-        return tile_list
+    def get_catalog_placements(
+        self, position: Position, size: int
+    ) -> tuple[Placement, ...]:
+        """
+        Get the possible placements of the tile at a specified position of a grid
+        of the given size, in the same order as get_possible_placements_at.
+        The catalog of a shape and size is shared by all the tiles with that shape,
+        and the placements at every position are computed the first time they are needed.
+        """
+        key = (self.shape, size)
+        catalog = PLACEMENT_CATALOGS.get(key)
+        if catalog is None:
+            catalog = PLACEMENT_CATALOGS[key] = [None] * (size * size)
+
+        anchor = position.x * size + position.y
+        placements = catalog[anchor]
+        if placements is None:
+            placements = catalog[anchor] = tuple(
+                Placement.from_positions(positions, size)
+                for positions in self.get_possible_placements_at(position)
+            )
+        return placements
 
     def get_possible_tiles_at(self, position: Position) -> list[Tile]:
         """Get all the possible tiles at a specified position."""
-        self.move_to(position)
-
-        tile_list: list[Tile] = []
-        tile_list += QuantumTile.get_tiles(self.raw_positions, self.positions, self.id)
-        tile_list += QuantumTile.get_tiles(
-            self.rotated_raw_positions, self.rotated_positions, self.id
-        )
-
-        return tile_list
+        return [
+            QuantumTile.make_tile(placement, self.id)
+            for placement in self.get_possible_placements_at(position)
+        ]
 
     def collapse(self) -> Tile:
         """Collapse the tile to be placed at (0,0). Not used in the game"""
-        return self.collapse_at(Position(0, 0))
+        return self.collapse_at(Position.get(0, 0))
 
     def collapse_at(self, position: Position) -> Tile:
         """Collapse the tile to a single position. Not used in the game"""
@@ -180,15 +269,15 @@ class QuantumTileMaker:
     @staticmethod
     def get1x1() -> QuantumTile:
         """Get a 1x1 tile."""
-        tile = QuantumTile([Position(0, 0)])
+        tile = QuantumTile([Position.get(0, 0)])
         return tile
 
     @staticmethod
     def get2x1() -> QuantumTile:
         """Get a 2x1 tile."""
         tile = QuantumTile(
-            [Position(0, 0), Position(1, 0)],
-            [Position(0, 0), Position(0, 1)]
+            [Position.get(0, 0), Position.get(1, 0)],
+            [Position.get(0, 0), Position.get(0, 1)],
         )
         return tile
 
@@ -196,8 +285,8 @@ class QuantumTileMaker:
     def get3x1() -> QuantumTile:
         """Get a 3x1 tile."""
         tile = QuantumTile(
-            [Position(0, 0), Position(1, 0), Position(2, 0)],
-            [Position(0, 0), Position(0, 1), Position(0, 2)],
+            [Position.get(0, 0), Position.get(1, 0), Position.get(2, 0)],
+            [Position.get(0, 0), Position.get(0, 1), Position.get(0, 2)],
         )
         return tile
 
@@ -205,7 +294,12 @@ class QuantumTileMaker:
     def get2x2() -> QuantumTile:
         """Get a 2x2 tile."""
         tile = QuantumTile(
-            [Position(0, 0), Position(1, 0), Position(0, 1), Position(1, 1)]
+            [
+                Position.get(0, 0),
+                Position.get(1, 0),
+                Position.get(0, 1),
+                Position.get(1, 1),
+            ]
         )
         return tile
 
@@ -214,20 +308,20 @@ class QuantumTileMaker:
         """Get a 3x2 tile."""
         tile = QuantumTile(
             [
-                Position(0, 0),
-                Position(1, 0),
-                Position(2, 0),
-                Position(0, 1),
-                Position(1, 1),
-                Position(2, 1),
+                Position.get(0, 0),
+                Position.get(1, 0),
+                Position.get(2, 0),
+                Position.get(0, 1),
+                Position.get(1, 1),
+                Position.get(2, 1),
             ],
             [
-                Position(0, 0),
-                Position(0, 1),
-                Position(0, 2),
-                Position(1, 0),
-                Position(1, 1),
-                Position(1, 2),
+                Position.get(0, 0),
+                Position.get(0, 1),
+                Position.get(0, 2),
+                Position.get(1, 0),
+                Position.get(1, 1),
+                Position.get(1, 2),
             ],
         )
         return tile
@@ -0,0 +1,111 @@
+"""
+This file contains the TranspositionTable class,
+which remembers the results of searched positions by their Zobrist hash.
+"""
+
+from typing import NamedTuple
+from enums import Bound
+
+# Approximate memory used by one entry: the tuple, its fields and the slot in the list
+ENTRY_SIZE_BYTES = 160
+
+
+class TableEntry(NamedTuple):
+    """A searched position stored in the transposition table."""
+
+    key: int
+    depth: int
+    bound: Bound
+    score: int
+    best_move: int
+    generation: int
+
+    def cuts_off(self, depth: int, alpha: int, beta: int) -> bool:
+        """
+        Check if the stored score can be returned
+        instead of searching the position to the given depth with the given window.
+        """
+        if self.depth < depth:
+            return False
+        if self.bound == Bound.EXACT:
+            return True
+        if self.bound == Bound.LOWER:
+            return self.score >= beta
+        return self.score <= alpha
+
+
+class TranspositionTable:
+    """
+    Fixed-size table of searched positions, indexed by their Zobrist hash.
+    When two positions fall in the same slot, the one searched deeper is kept,
+    unless the stored one comes from an older search.
+    """
+
+    def __init__(self, size_mb: float = 16) -> None:
+        self.number_of_entries = max(1, int(size_mb * 1024 * 1024) // ENTRY_SIZE_BYTES)
+        self.entries: list[TableEntry] = [None] * self.number_of_entries
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.overwrites = 0
+
+    def __getstate__(self) -> dict:
+        # The entries are not sent to other processes, only the size of the table
+        state = self.__dict__.copy()
+        state["entries"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.entries = [None] * self.number_of_entries
+
+    def new_search(self) -> None:
+        """Marks the stored entries as coming from an older search."""
+        self.generation += 1
+
+    def clear(self) -> None:
+        """Removes all the entries and resets the counters."""
+        self.entries = [None] * self.number_of_entries
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.overwrites = 0
+
+    def probe(self, key: int) -> TableEntry | None:
+        """Get the entry stored for the position, or None."""
+        entry = self.entries[key % self.number_of_entries]
+
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        return None
+
+    # pylint: disable=too-many-arguments
+    def store(
+        self, key: int, depth: int, bound: Bound, score: int, best_move: int
+    ) -> None:
+        """
+        Stores the result of a search,
+        unless the slot holds a deeper search of another position from the current search.
+        """
+        slot = key % self.number_of_entries
+        entry = self.entries[slot]
+
+        if entry is not None and entry.key != key:
+            if entry.generation == self.generation and entry.depth > depth:
+                return
+            self.overwrites += 1
+
+        self.entries[slot] = TableEntry(
+            key, depth, bound, score, best_move, self.generation
+        )
+
+    def get_hit_rate(self) -> float:
+        """Get the fraction of probes that found their position."""
+        probes = self.hits + self.misses
+        if probes == 0:
+            return 0.0
+        return self.hits / probes